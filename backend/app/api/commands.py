@@ -1,35 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+
+import msgspec
 import structlog
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
 
-from ..core.config import Settings, get_settings
-from ..core.network import get_ipv4_adapters
+from ..core.network import (
+    _calculate_meca_address,
+    get_cached_ipv4_adapters_payload,
+    get_ipv4_adapters_payload,
+    validate_meca_address,
+)
 from ..services.hardware.meca500 import Meca500Controller
 
 logger = structlog.get_logger(__name__)
 router = APIRouter(prefix="/api/commands", tags=["commands"])
 
-# Singleton instances; in production, use dependency injection or app state
-_meca500_controller: Optional[Meca500Controller] = None
-
-
-async def get_meca500(settings: Settings = Depends(get_settings)) -> Meca500Controller:
-    """Dependency to get or create the Meca500 controller."""
-    global _meca500_controller
-    if _meca500_controller is None:
-        meca_ip = getattr(settings, "meca500_address", "192.168.0.100")
-        try:
-            _meca500_controller = Meca500Controller(address=meca_ip)
-        except Exception as e:
-            logger.error("meca500_init_failed", error=str(e))
-            raise HTTPException(status_code=503, detail=f"Meca500 init failed: {e}")
-    return _meca500_controller
-
-
+def get_meca500(request: Request) -> Meca500Controller:
+    """Dependency returning the Meca500 controller created at startup."""
+    return request.app.state.meca500
 
 
 class MotorCommand(BaseModel):
@@ -42,11 +35,31 @@ class RobotCommand(BaseModel):
     command: str
 
 
-class DeviceCommand(BaseModel):
+class DeviceCommand(msgspec.Struct, kw_only=True):
+    """Device command body; fields other than command/port land in ``extra``.
+
+    Decoded with msgspec rather than Pydantic: the handlers read loosely
+    typed per-command fields, so full model validation bought nothing.
+    """
+
     command: str
     port: str = ""
-    
-    model_config = {"extra": "allow"}  # Allow additional fields
+    extra: Dict[str, Any] = msgspec.field(default_factory=dict)
+
+
+_DEVICE_COMMAND_DECODER = msgspec.json.Decoder(Dict[str, Any])
+
+
+def _decode_device_command(body: bytes) -> DeviceCommand:
+    try:
+        fields = _DEVICE_COMMAND_DECODER.decode(body)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid device command body: {e}")
+    command = fields.pop("command", None)
+    port = fields.pop("port", "")
+    if not isinstance(command, str) or not isinstance(port, str):
+        raise HTTPException(status_code=422, detail="Device command requires string 'command' (and 'port')")
+    return DeviceCommand(command=command, port=port, extra=fields)
 
 
 @router.post("/motors/xy")
@@ -70,20 +83,21 @@ async def robot_command(cmd: RobotCommand):
 
 
 @router.get("/network/adapters")
-async def get_network_adapters():
-    """List all available network adapters with calculated Meca500 addresses."""
-    adapters = get_ipv4_adapters()
-    return {
-        "adapters": [adapter.to_dict() for adapter in adapters],
-        "count": len(adapters),
-    }
+async def get_network_adapters(refresh: bool = False):
+    """List all available network adapters with calculated Meca500 addresses.
+
+    Discovery is cached briefly; pass ``?refresh=true`` to re-scan now.
+    """
+    payload = None if refresh else get_cached_ipv4_adapters_payload()
+    if payload is None:
+        # Discovery does blocking system calls; keep them off the event loop
+        payload = await asyncio.to_thread(get_ipv4_adapters_payload, refresh)
+    return payload
 
 
 @router.post("/network/meca-address")
 async def get_meca_address(adapter_name: str, ip: str, netmask: str = "255.255.255.0"):
     """Get the recommended Meca500 address for a specific adapter."""
-    from ..core.network import _calculate_meca_address, validate_meca_address
-    
     meca_addr = _calculate_meca_address(ip, netmask)
     is_valid = validate_meca_address(meca_addr, ip, netmask)
     
@@ -98,12 +112,16 @@ async def get_meca_address(adapter_name: str, ip: str, netmask: str = "255.255.2
 
 @router.post("/device")
 async def device_control(
-    cmd: DeviceCommand,
+    request: Request,
     meca500: Meca500Controller = Depends(get_meca500),
 ):
     """Handle device-level control commands (activate, calibrate, etc.)."""
+    cmd = _decode_device_command(await request.body())
+    handler = _DEVICE_HANDLERS.get(cmd.command)
+    if handler is None:
+        raise HTTPException(status_code=400, detail=f"Unknown device command: {cmd.command}")
     try:
-        return await _device_control_inner(cmd, meca500)
+        return await handler(cmd, meca500)
     except HTTPException:
         raise
     except Exception as e:
@@ -111,147 +129,185 @@ async def device_control(
         return {"error": str(e), "command": cmd.command}
 
 
-async def _device_control_inner(cmd: DeviceCommand, meca500: Meca500Controller):
-    """Inner device control logic."""
-    # === Meca500 Commands ===
-    if "meca500_activate" in cmd.command:
-        # Allow overriding address from command payload
-        if hasattr(cmd, "address"):
-            meca500.address = cmd.address
-        result = await meca500.activate_and_home()
-        if result.get("success"):
-            status = await meca500.get_status()
-            return {"connected": meca500._connected, "enabled": meca500._activated, **(status or {})}
-        else:
-            return {"error": result.get("error", "Activation failed"), **{k: v for k, v in result.items() if k != "success"}}
-    
-    elif "meca500_deactivate" in cmd.command:
-        success = await meca500.deactivate()
-        return {"connected": meca500._connected, "enabled": False} if success else {"error": "Deactivation failed"}
-    
-    elif "meca500_zero_joints" in cmd.command:
-        success = await meca500.zero_all_joints()
-        joints = await meca500.get_joints()
-        return {"status": "joints_zeroed", "joints": joints} if success else {"error": "Zero joints failed"}
-    elif "meca500_move_joints" in cmd.command:
-        # Expecting `angles` list in payload
-        angles = getattr(cmd, "angles", None)
-        if not angles or len(angles) != 6:
-            return {"error": "Invalid angles payload"}
-        success = await meca500.move_joints(*angles)
-        joints = await meca500.get_joints()
-        return {"moved": success, "joints": joints} if success else {"error": "Move joints failed"}
-
-    elif "meca500_move_shipping" in cmd.command:
-        success = await meca500.move_to_shipping()
-        status = await meca500.get_status()
-        return {"moved": success, **status} if success else {"error": "Move to shipping failed"}
-
-    elif "meca500_move_tool_delta" in cmd.command:
-        # Expecting dx, dy, dz and optional targetOrientation
-        dx = getattr(cmd, "dx", 0)
-        dy = getattr(cmd, "dy", 0)
-        dz = getattr(cmd, "dz", 0)
-        target_orientation = getattr(cmd, "targetOrientation", None)
-        success = await meca500.move_tool_delta(float(dx), float(dy), float(dz), target_orientation)
+# === Meca500 Commands ===
+async def _meca500_activate(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Allow overriding address from command payload
+    if "address" in cmd.extra:
+        meca500.address = cmd.extra["address"]
+    result = await meca500.activate_and_home()
+    if result.get("success"):
         status = await meca500.get_status()
-        return {"moved": success, **status} if success else {"error": "Tool delta move failed"}
-
-    elif "meca500_move_pose" in cmd.command:
-        # Move to absolute Cartesian XYZ position (keeps orientation from optional params or current)
-        x = float(getattr(cmd, "x", 0))
-        y = float(getattr(cmd, "y", 0))
-        z = float(getattr(cmd, "z", 0))
-        alpha = getattr(cmd, "alpha", None)
-        beta = getattr(cmd, "beta", None)
-        gamma = getattr(cmd, "gamma", None)
-        # Fill orientation from current pose if not provided
-        if alpha is None or beta is None or gamma is None:
-            current = await meca500.get_pose()
-            if current:
-                alpha = float(alpha) if alpha is not None else current.get("alpha", 0)
-                beta = float(beta) if beta is not None else current.get("beta", 0)
-                gamma = float(gamma) if gamma is not None else current.get("gamma", 0)
-            else:
-                alpha = float(alpha or 0)
-                beta = float(beta or 0)
-                gamma = float(gamma or 0)
-        success = await meca500.move_to_pose(x, y, z, float(alpha), float(beta), float(gamma))
-        pose = await meca500.get_pose()
-        return {"moved": success, "pose": pose} if success else {"error": "Move pose failed"}
-
-    elif "meca500_get_pose" in cmd.command:
-        try:
-            if not meca500._connected:
-                return {"pose": None, "joints": None, "connected": False}
-            pose = await meca500.get_pose()
-            joints = await meca500.get_joints()
-            status = await meca500.get_status()
-            return {"pose": pose, "joints": list(joints) if joints else None, "connected": True, **(status or {})}
-        except Exception as e:
-            logger.error("meca500_get_pose_endpoint_failed", error=str(e))
-            return {"pose": None, "joints": None, "connected": meca500._connected, "error": str(e)}
-
-    elif "meca500_move_xyz_delta" in cmd.command:
-        # Relative XYZ delta move in Cartesian space, preserving orientation
-        dx = float(getattr(cmd, "dx", 0))
-        dy = float(getattr(cmd, "dy", 0))
-        dz = float(getattr(cmd, "dz", 0))
-        success = await meca500.move_tool_delta(dx, dy, dz)
-        pose = await meca500.get_pose()
-        return {"moved": success, "pose": pose} if success else {"error": "XYZ delta move failed"}
-    
-    elif "meca500_valve_open" in cmd.command:
-        bank = getattr(cmd, "bank", 1)
-        pin = getattr(cmd, "pin", 1)
-        success = await meca500.set_valve(bank, pin, True)
-        return {"valve_state": True, "bank": bank, "pin": pin} if success else {"error": "Valve open failed"}
-    
-    elif "meca500_valve_close" in cmd.command:
-        bank = getattr(cmd, "bank", 1)
-        pin = getattr(cmd, "pin", 1)
-        success = await meca500.set_valve(bank, pin, False)
-        return {"valve_state": False, "bank": bank, "pin": pin} if success else {"error": "Valve close failed"}
-    
-    elif "meca500_connect" in cmd.command:
-        # Allow overriding address from command payload
-        if hasattr(cmd, "address"):
-            meca500.address = cmd.address
-        success = await meca500.connect()
-        return {"connected": True} if success else {"error": "Connection failed"}
-    
-    elif "meca500_disconnect" in cmd.command:
-        await meca500.disconnect()
-        return {"connected": False}
-    
-    # === Bota Commands ===
-    elif "bota_tare" in cmd.command:
-        # TODO: Implement Bota tare
-        return {"connected": True, "tared": True}
-    
-    # === Standa Stage Motor Commands ===
-    elif "standa_connect" in cmd.command:
-        # TODO: Implement Standa ximc connection
-        port = getattr(cmd, "port", "")
-        return {"connected": True, "port": port}
-    
-    elif "standa_disconnect" in cmd.command:
-        # TODO: Implement Standa ximc disconnection
-        return {"connected": False}
-    
-    elif "standa_home" in cmd.command:
-        # TODO: Implement Standa homing
-        return {"status": "homed", "x": 0, "y": 0, "z": 0}
+        return {"connected": meca500._connected, "enabled": meca500._activated, **(status or {})}
+    return {"error": result.get("error", "Activation failed"), **{k: v for k, v in result.items() if k != "success"}}
+
+
+async def _meca500_deactivate(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    success = await meca500.deactivate()
+    return {"connected": meca500._connected, "enabled": False} if success else {"error": "Deactivation failed"}
+
+
+async def _meca500_zero_joints(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    success = await meca500.zero_all_joints()
+    joints = await meca500.get_joints()
+    return {"status": "joints_zeroed", "joints": joints} if success else {"error": "Zero joints failed"}
+
+
+async def _meca500_move_joints(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Expecting `angles` list in payload
+    angles = cmd.extra.get("angles")
+    if not angles or len(angles) != 6:
+        return {"error": "Invalid angles payload"}
+    success = await meca500.move_joints(*angles)
+    joints = await meca500.get_joints()
+    return {"moved": success, "joints": joints} if success else {"error": "Move joints failed"}
+
+
+async def _meca500_move_shipping(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    success = await meca500.move_to_shipping()
+    status = await meca500.get_status()
+    return {"moved": success, **status} if success else {"error": "Move to shipping failed"}
+
+
+async def _meca500_move_tool_delta(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Expecting dx, dy, dz and optional targetOrientation
+    dx = cmd.extra.get("dx", 0)
+    dy = cmd.extra.get("dy", 0)
+    dz = cmd.extra.get("dz", 0)
+    target_orientation = cmd.extra.get("targetOrientation")
+    success = await meca500.move_tool_delta(float(dx), float(dy), float(dz), target_orientation)
+    status = await meca500.get_status()
+    return {"moved": success, **status} if success else {"error": "Tool delta move failed"}
+
+
+async def _meca500_move_pose(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Move to absolute Cartesian XYZ position (keeps orientation from optional params or current)
+    x = float(cmd.extra.get("x", 0))
+    y = float(cmd.extra.get("y", 0))
+    z = float(cmd.extra.get("z", 0))
+    alpha = cmd.extra.get("alpha")
+    beta = cmd.extra.get("beta")
+    gamma = cmd.extra.get("gamma")
+    # Fill orientation from current pose if not provided
+    if alpha is None or beta is None or gamma is None:
+        current = await meca500.get_pose()
+        if current:
+            alpha = float(alpha) if alpha is not None else current.get("alpha", 0)
+            beta = float(beta) if beta is not None else current.get("beta", 0)
+            gamma = float(gamma) if gamma is not None else current.get("gamma", 0)
+        else:
+            alpha = float(alpha or 0)
+            beta = float(beta or 0)
+            gamma = float(gamma or 0)
+    success = await meca500.move_to_pose(x, y, z, float(alpha), float(beta), float(gamma))
+    pose = await meca500.get_pose()
+    return {"moved": success, "pose": pose} if success else {"error": "Move pose failed"}
 
-    elif "standa_move" in cmd.command:
-        axis = getattr(cmd, "axis", "x")
-        value = float(getattr(cmd, "value", 0))
-        return {"axis": axis, "position": value, "status": "moved"}
 
-    elif "standa_stop" in cmd.command:
-        return {"status": "stopped"}
-    
-    raise HTTPException(status_code=400, detail=f"Unknown device command: {cmd.command}")
+async def _meca500_get_pose(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    try:
+        if not meca500._connected:
+            return {"pose": None, "joints": None, "connected": False}
+        # One fused read: the three getters would serialize on the robot I/O thread anyway
+        pose, joints, status = await meca500.get_state()
+        return {"pose": pose, "joints": list(joints) if joints else None, "connected": True, **(status or {})}
+    except Exception as e:
+        logger.error("meca500_get_pose_endpoint_failed", error=str(e))
+        return {"pose": None, "joints": None, "connected": meca500._connected, "error": str(e)}
+
+
+async def _meca500_move_xyz_delta(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Relative XYZ delta move in Cartesian space, preserving orientation
+    dx = float(cmd.extra.get("dx", 0))
+    dy = float(cmd.extra.get("dy", 0))
+    dz = float(cmd.extra.get("dz", 0))
+    success = await meca500.move_tool_delta(dx, dy, dz)
+    pose = await meca500.get_pose()
+    return {"moved": success, "pose": pose} if success else {"error": "XYZ delta move failed"}
+
+
+async def _meca500_valve_open(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    bank = cmd.extra.get("bank", 1)
+    pin = cmd.extra.get("pin", 1)
+    success = await meca500.set_valve(bank, pin, True)
+    return {"valve_state": True, "bank": bank, "pin": pin} if success else {"error": "Valve open failed"}
+
+
+async def _meca500_valve_close(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    bank = cmd.extra.get("bank", 1)
+    pin = cmd.extra.get("pin", 1)
+    success = await meca500.set_valve(bank, pin, False)
+    return {"valve_state": False, "bank": bank, "pin": pin} if success else {"error": "Valve close failed"}
+
+
+async def _meca500_connect(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # Allow overriding address from command payload
+    if "address" in cmd.extra:
+        meca500.address = cmd.extra["address"]
+    success = await meca500.connect()
+    return {"connected": True} if success else {"error": "Connection failed"}
+
+
+async def _meca500_disconnect(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    await meca500.disconnect()
+    return {"connected": False}
+
+
+# === Bota Commands ===
+async def _bota_tare(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # TODO: Implement Bota tare
+    return {"connected": True, "tared": True}
+
+
+# === Standa Stage Motor Commands ===
+async def _standa_connect(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # TODO: Implement Standa ximc connection
+    port = cmd.port
+    return {"connected": True, "port": port}
+
+
+async def _standa_disconnect(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # TODO: Implement Standa ximc disconnection
+    return {"connected": False}
+
+
+async def _standa_home(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    # TODO: Implement Standa homing
+    return {"status": "homed", "x": 0, "y": 0, "z": 0}
+
+
+async def _standa_move(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    axis = cmd.extra.get("axis", "x")
+    value = float(cmd.extra.get("value", 0))
+    return {"axis": axis, "position": value, "status": "moved"}
+
+
+async def _standa_stop(cmd: DeviceCommand, meca500: Meca500Controller) -> dict:
+    return {"status": "stopped"}
+
+
+# Exact command name -> handler; one dict lookup per request instead of a
+# chain of substring tests (which also let "x" match "x_extended").
+_DEVICE_HANDLERS: Dict[str, Callable[[DeviceCommand, Meca500Controller], Awaitable[dict]]] = {
+    "meca500_activate": _meca500_activate,
+    "meca500_deactivate": _meca500_deactivate,
+    "meca500_zero_joints": _meca500_zero_joints,
+    "meca500_move_joints": _meca500_move_joints,
+    "meca500_move_shipping": _meca500_move_shipping,
+    "meca500_move_tool_delta": _meca500_move_tool_delta,
+    "meca500_move_pose": _meca500_move_pose,
+    "meca500_get_pose": _meca500_get_pose,
+    "meca500_move_xyz_delta": _meca500_move_xyz_delta,
+    "meca500_valve_open": _meca500_valve_open,
+    "meca500_valve_close": _meca500_valve_close,
+    "meca500_connect": _meca500_connect,
+    "meca500_disconnect": _meca500_disconnect,
+    "bota_tare": _bota_tare,
+    "standa_connect": _standa_connect,
+    "standa_disconnect": _standa_disconnect,
+    "standa_home": _standa_home,
+    "standa_move": _standa_move,
+    "standa_stop": _standa_stop,
+}
 
 
 @router.post("/safety/emergency-stop")
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import List
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -21,7 +22,12 @@ class Settings(BaseSettings):
     meca500_port: int = Field(default=10000, description="TCP port for Meca500")
     pdxc2_serial: str = Field(default="112498387", description="Serial number of PDXC2 device")
     pdxc2_usb_port: str = Field(default="", description="USB port identifier from Device Manager (e.g., Port_#0007.Hub_#0001)")
+    pdxc2_poll_interval_ms: int = Field(default=250, description="Kinesis status polling period for PDXC2 (ms)")
     pdxc2_default_mode: str = Field(default="open_loop", description="Default control mode: open_loop or closed_loop")
+    cors_origins: List[str] = Field(
+        default=["http://localhost:5173", "http://127.0.0.1:5173"],
+        description="Browser origins allowed to call the API (JSON list in env, e.g. CORS_ORIGINS)",
+    )
 
     class Config:
         env_file = ".env"
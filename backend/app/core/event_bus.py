@@ -1,32 +1,112 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
-from typing import Any, AsyncIterator, Dict
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_Subscriber = Tuple[Deque[Any], asyncio.Event]
 
 
 class EventBus:
-    """Simple pub/sub bus built on asyncio queues for realtime telemetry."""
+    """Simple pub/sub bus for realtime telemetry.
+
+    Each subscriber owns a fixed-size ring buffer: when a slow consumer falls
+    behind, the oldest samples are overwritten so it always sees the most
+    recent data. Subscriber lists are immutable tuples replaced wholesale on
+    subscribe/unsubscribe, so ``publish`` reads a snapshot without locking.
+    """
 
     def __init__(self) -> None:
-        self._topics: Dict[str, list[asyncio.Queue[Any]]] = defaultdict(list)
-        self._lock = asyncio.Lock()
+        self._topics: Dict[str, tuple[_Subscriber, ...]] = {}
+        self._lock = threading.Lock()
 
-    async def publish(self, topic: str, payload: Any) -> None:
-        async with self._lock:
-            subscribers = list(self._topics.get(topic, []))
-        for queue in subscribers:
-            if not queue.full():
-                queue.put_nowait(payload)
+    def publish(self, topic: str, payload: Any) -> None:
+        for buffer, ready in self._topics.get(topic, ()):
+            buffer.append(payload)
+            ready.set()
 
     async def subscribe(self, topic: str, max_queue: int = 32) -> AsyncIterator[Any]:
-        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_queue)
-        async with self._lock:
-            self._topics[topic].append(queue)
-        try:
+        with self._subscriber(topic, max_queue) as (buffer, ready):
             while True:
-                item = await queue.get()
-                yield item
+                await ready.wait()
+                ready.clear()
+                while buffer:
+                    yield buffer.popleft()
+
+    @contextmanager
+    def _subscriber(self, topic: str, max_queue: int) -> Iterator[_Subscriber]:
+        subscriber: _Subscriber = (deque(maxlen=max_queue), asyncio.Event())
+        with self._lock:
+            self._topics[topic] = self._topics.get(topic, ()) + (subscriber,)
+        try:
+            yield subscriber
         finally:
-            async with self._lock:
-                self._topics[topic].remove(queue)
+            with self._lock:
+                remaining = tuple(s for s in self._topics.get(topic, ()) if s is not subscriber)
+                if remaining:
+                    self._topics[topic] = remaining
+                else:
+                    self._topics.pop(topic, None)
+
+
+class BroadcastBuffer:
+    """Single-writer ring buffer shared by every reader of one stream.
+
+    Entries are ``(seq, payload)`` with a monotonic sequence number. Each
+    reader keeps its own cursor and reads forward, so memory is O(capacity)
+    no matter how many readers are attached. A reader that falls more than
+    ``capacity`` entries behind skips ahead to the oldest retained entry and
+    the skipped count is logged.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self._entries: Deque[Tuple[int, Any]] = deque(maxlen=capacity)
+        self._next_seq = 0
+        # Replaced on every publish; readers waiting on the old one are woken
+        self._ready = asyncio.Event()
+
+    def publish(self, payload: Any) -> None:
+        self._entries.append((self._next_seq, payload))
+        self._next_seq += 1
+        ready, self._ready = self._ready, asyncio.Event()
+        ready.set()
+
+    def read_from(self, cursor: int) -> Tuple[List[Any], int, int]:
+        """Return ``(payloads, next_cursor, dropped)`` for everything at or after ``cursor``."""
+        entries = self._entries
+        if not entries:
+            return [], cursor, 0
+        oldest = entries[0][0]
+        dropped = 0
+        if cursor < oldest:
+            dropped = oldest - cursor
+            cursor = oldest
+        payloads = [payload for seq, payload in entries if seq >= cursor]
+        return payloads, self._next_seq, dropped
+
+    async def subscribe(self, max_batch: int = 64, linger: float = 0.0) -> AsyncIterator[List[Any]]:
+        """Yield new entries as lists, starting from the next publish.
+
+        ``linger`` (seconds) delays the read after a wakeup so bursts
+        coalesce; ``max_batch`` keeps only the newest entries of a batch.
+        """
+        cursor = self._next_seq
+        while True:
+            if cursor == self._next_seq:
+                await self._ready.wait()
+            if linger > 0:
+                await asyncio.sleep(linger)
+            batch, cursor, dropped = self.read_from(cursor)
+            if len(batch) > max_batch:
+                dropped += len(batch) - max_batch
+                batch = batch[-max_batch:]
+            if dropped:
+                logger.warning("broadcast_reader_lagged", dropped=dropped)
+            if batch:
+                yield batch
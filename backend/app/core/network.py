@@ -1,15 +1,19 @@
 """Network adapter discovery and configuration for robot connections."""
 
 import socket
-import ipaddress
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+import struct
+import time
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
 import logging
 
+import psutil
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NetworkAdapter:
     """Represents a network adapter configuration."""
     name: str
@@ -17,148 +21,182 @@ class NetworkAdapter:
     netmask: str
     gateway: str
     meca_address: str  # Calculated Meca500 address for this subnet
+    _as_dict: Dict[str, Any] = field(init=False, repr=False, compare=False)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def __post_init__(self) -> None:
+        # slots rules out functools.cached_property, so build the payload up front
+        object.__setattr__(self, "_as_dict", {
             "name": self.name,
             "ip_address": self.ip_address,
             "netmask": self.netmask,
             "gateway": self.gateway,
             "meca_address": self.meca_address,
-        }
+        })
+
+    @property
+    def as_dict(self) -> Dict[str, Any]:
+        """Shared, precomputed dict form; treat as read-only."""
+        return self._as_dict
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._as_dict)
 
 
-def get_ipv4_adapters() -> List[NetworkAdapter]:
+# Adapters change on the order of minutes, so discovery results are reused
+# for this long before the host is probed again.
+ADAPTER_CACHE_TTL_SEC = 30.0
+
+_adapter_cache: Optional[Tuple[float, List[NetworkAdapter], Dict[str, Any]]] = None
+
+
+def get_ipv4_adapters(refresh: bool = False) -> List[NetworkAdapter]:
     """
     Discover all active IPv4 network adapters and calculate Meca500 addresses.
     
+    Results are cached for ``ADAPTER_CACHE_TTL_SEC``; pass ``refresh=True``
+    to force a new discovery.
+    
     Returns:
         List of NetworkAdapter objects with calculated Meca addresses
     """
+    return _get_cached_adapters(refresh)[1]
+
+
+def get_ipv4_adapters_payload(refresh: bool = False) -> Dict[str, Any]:
+    """Return the cached ``{"adapters": [...], "count": n}`` API payload."""
+    return _get_cached_adapters(refresh)[2]
+
+
+def get_cached_ipv4_adapters_payload() -> Optional[Dict[str, Any]]:
+    """Return the cached API payload if still fresh, without ever probing the host.
+
+    Lets async callers skip the thread hop for blocking discovery on a cache hit.
+    """
+    cache = _adapter_cache
+    if cache is None or (time.monotonic() - cache[0]) >= ADAPTER_CACHE_TTL_SEC:
+        return None
+    return cache[2]
+
+
+def _get_cached_adapters(refresh: bool) -> Tuple[float, List[NetworkAdapter], Dict[str, Any]]:
+    global _adapter_cache
+    now = time.monotonic()
+    if refresh or _adapter_cache is None or (now - _adapter_cache[0]) >= ADAPTER_CACHE_TTL_SEC:
+        # Blocking system calls; async callers should run this in a thread
+        adapters = _discover_ipv4_adapters()
+        payload = {
+            "adapters": [adapter.as_dict for adapter in adapters],
+            "count": len(adapters),
+        }
+        _adapter_cache = (now, adapters, payload)
+    return _adapter_cache
+
+
+def _discover_ipv4_adapters() -> List[NetworkAdapter]:
     adapters = []
     
     try:
-        # Get all network interfaces
-        hostname = socket.gethostname()
-        
-        # Use socket.getaddrinfo to find local addresses
-        for info in socket.getaddrinfo(hostname, None):
-            if info[0] != socket.AF_INET:
-                continue
-            
-            ip = info[4][0]
-            
-            # Skip loopback
-            if ip.startswith("127."):
+        # One call each for addresses and link state, with real names/netmasks
+        stats = psutil.net_if_stats()
+        for name, addrs in psutil.net_if_addrs().items():
+            stat = stats.get(name)
+            if stat is not None and not stat.isup:
                 continue
             
-            # Try to get netmask for this IP
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect((ip, 80))
-                local_ip = s.getsockname()[0]
-                s.close()
-                
-                # Calculate netmask and gateway
-                netmask = "255.255.255.0"  # Default /24
-                gateway = _calculate_gateway(local_ip, netmask)
-                meca_addr = _calculate_meca_address(local_ip, netmask)
+            for addr in addrs:
+                if addr.family != socket.AF_INET or addr.address.startswith("127."):
+                    continue
                 
+                ip = addr.address
+                netmask = addr.netmask or "255.255.255.0"
                 adapter = NetworkAdapter(
-                    name=f"Adapter - {local_ip}",
-                    ip_address=local_ip,
+                    name=name,
+                    ip_address=ip,
                     netmask=netmask,
-                    gateway=gateway,
-                    meca_address=meca_addr,
+                    gateway=_calculate_gateway(ip, netmask),
+                    meca_address=_calculate_meca_address(ip, netmask),
                 )
                 adapters.append(adapter)
-                
-            except Exception as e:
-                logger.debug(f"Error getting netmask for {ip}: {e}")
-                continue
-        
-        # If no adapters found via getaddrinfo, try alternative method
-        if not adapters:
-            adapters = _get_adapters_windows()
     
     except Exception as e:
-        logger.error("Error discovering network adapters", error=str(e))
+        logger.error(f"Error discovering network adapters: {e}")
     
     return adapters
 
 
-def _get_adapters_windows() -> List[NetworkAdapter]:
-    """Fallback: Get adapters on Windows using socket operations."""
-    adapters = []
-    
-    try:
-        # Get local hostname and its IPs
-        hostname = socket.gethostname()
-        ips = socket.gethostbyname_ex(hostname)
-        
-        for ip in ips[2]:
-            if ip.startswith("127."):
-                continue
-            
-            netmask = "255.255.255.0"
-            gateway = _calculate_gateway(ip, netmask)
-            meca_addr = _calculate_meca_address(ip, netmask)
-            
-            adapter = NetworkAdapter(
-                name=f"Adapter - {ip}",
-                ip_address=ip,
-                netmask=netmask,
-                gateway=gateway,
-                meca_address=meca_addr,
-            )
-            adapters.append(adapter)
-    
-    except Exception as e:
-        logger.error("Error discovering Windows adapters", error=str(e))
-    
-    return adapters
+_IPV4_ALL_ONES = 0xFFFFFFFF
+
+
+def _ip_to_int(address: str) -> int:
+    """Convert a dotted-quad IPv4 string to a 32-bit integer."""
+    return struct.unpack(">I", socket.inet_aton(address))[0]
+
+
+def _int_to_ip(value: int) -> str:
+    """Convert a 32-bit integer to a dotted-quad IPv4 string."""
+    return socket.inet_ntoa(struct.pack(">I", value))
+
+
+def _netmask_to_int(netmask: str) -> int:
+    """Parse a dotted netmask (or bare prefix length) into a 32-bit mask."""
+    if netmask.isdigit():
+        prefix = int(netmask)
+        if prefix > 32:
+            raise ValueError(f"Invalid prefix length: {netmask}")
+        return (_IPV4_ALL_ONES << (32 - prefix)) & _IPV4_ALL_ONES
+    mask = _ip_to_int(netmask)
+    host_bits = ~mask & _IPV4_ALL_ONES
+    if host_bits & (host_bits + 1):
+        raise ValueError(f"Non-contiguous netmask: {netmask}")
+    return mask
 
 
+@lru_cache(maxsize=64)
 def _calculate_gateway(ip: str, netmask: str) -> str:
     """Calculate gateway address from IP and netmask (usually .1)."""
     try:
-        network = ipaddress.IPv4Network(f"{ip}/{netmask}", strict=False)
+        network = _ip_to_int(ip) & _netmask_to_int(netmask)
         # Gateway is typically the first usable address in the subnet
-        return str(network.network_address + 1)
+        return _int_to_ip(network + 1)
     except Exception as e:
         logger.warning(f"Error calculating gateway: {e}")
         return "192.168.0.1"  # Fallback
 
 
+@lru_cache(maxsize=64)
 def _calculate_meca_address(ip: str, netmask: str) -> str:
     """
     Calculate recommended Meca500 address based on local IP and subnet.
     
     For a /24 subnet, uses .100 as default Meca500 address.
-    For other subnets, uses a reasonable address in the subnet.
+    For other subnets, uses the host 50 addresses below the broadcast
+    address (or the first host on subnets too small for that).
     """
     try:
-        network = ipaddress.IPv4Network(f"{ip}/{netmask}", strict=False)
+        mask = _netmask_to_int(netmask)
+        network = _ip_to_int(ip) & mask
         
         # For /24 networks, default to .100
-        if network.prefixlen == 24:
-            return str(ipaddress.IPv4Address(network.network_address) + 100)
+        if mask == 0xFFFFFF00:
+            return _int_to_ip(network + 100)
         
-        # For other networks, use a reasonable address
-        # Use 3/4 of the way through the subnet
-        usable_hosts = list(network.hosts())
-        if usable_hosts:
-            idx = max(0, len(usable_hosts) - 50)
-            return str(usable_hosts[idx])
+        # /31 and /32 have no network/broadcast reservation
+        size = (~mask & _IPV4_ALL_ONES) + 1
+        if size <= 2:
+            return _int_to_ip(network)
         
-        # Fallback
-        return str(network.network_address + 100)
+        usable_hosts = size - 2
+        if usable_hosts >= 50:
+            broadcast = network | (~mask & _IPV4_ALL_ONES)
+            return _int_to_ip(broadcast - 50)
+        return _int_to_ip(network + 1)
     
     except Exception as e:
         logger.warning(f"Error calculating Meca address: {e}")
         return "192.168.0.100"  # Fallback
 
 
+@lru_cache(maxsize=64)
 def validate_meca_address(address: str, ip: str, netmask: str) -> bool:
     """
     Validate that a Meca address is on the same subnet as the given IP.
@@ -172,9 +210,8 @@ def validate_meca_address(address: str, ip: str, netmask: str) -> bool:
         True if address is on the same subnet as ip/netmask
     """
     try:
-        network = ipaddress.IPv4Network(f"{ip}/{netmask}", strict=False)
-        meca_ip = ipaddress.IPv4Address(address)
-        return meca_ip in network
+        mask = _netmask_to_int(netmask)
+        return (_ip_to_int(address) & mask) == (_ip_to_int(ip) & mask)
     except Exception as e:
         logger.error(f"Error validating address: {e}")
         return False
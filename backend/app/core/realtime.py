@@ -21,6 +21,11 @@ class RealtimeTaskConfig(BaseModel):
     max_jitter_ms: float = Field(default=1.0)
     priority: int = Field(default=0, description="Lower value = higher priority")
     isolated: bool = Field(default=False)
+    inline: bool = Field(
+        default=False,
+        description="Await each tick inside the scheduler loop instead of a Task; "
+        "only for runs far shorter than every other task's deadline",
+    )
 
     @property
     def period_seconds(self) -> float:
@@ -50,6 +55,12 @@ class RealtimeTaskHandle:
     cancelled: bool = False
     last_stats: Optional[RealtimeTaskStats] = None
     _reschedule_at: float = field(default=0.0, init=False)
+    # Bumped on every push; heap entries carrying an older value are stale
+    _generation: int = field(default=0, init=False)
+    # Bound metric methods resolved once at registration for the hot path
+    _observe_latency: Callable[[float], None] = field(init=False, repr=False)
+    _observe_jitter: Callable[[float], None] = field(init=False, repr=False)
+    _inc_deadline: Callable[[], None] = field(init=False, repr=False)
 
     def cancel(self) -> None:
         self.cancelled = True
@@ -59,8 +70,10 @@ class RealTimeCoordinator:
     """Priority-based scheduler that enforces millisecond budgets for device loops."""
 
     def __init__(self, *, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
-        self._loop = loop or asyncio.get_event_loop()
-        self._queue: list[tuple[float, int, int, RealtimeTaskHandle]] = []
+        # Resolved lazily so the coordinator binds to whichever loop (uvloop or
+        # asyncio) is actually running, not the one current at import time.
+        self._loop = loop
+        self._queue: list[tuple[float, int, int, int, RealtimeTaskHandle]] = []
         self._seq = itertools.count()
         self._handles: Dict[str, RealtimeTaskHandle] = {}
         self._wakeup = asyncio.Event()
@@ -71,16 +84,20 @@ class RealTimeCoordinator:
         if self._running:
             return
         self._running = True
-        self._scheduler_task = self._loop.create_task(self._schedule_loop())
+        # Module-global gauge: the running coordinator owns it until stop()
+        metrics.RT_QUEUE_DEPTH.set_function(self._live_task_count)
+        self._scheduler_task = self._get_loop().create_task(self._schedule_loop())
         logger.info("realtime_coordinator_started")
 
     async def stop(self) -> None:
         self._running = False
         self._wakeup.set()
-        for handle in list(self._handles.values()):
+        for handle in self._handles.values():
             handle.cancel()
         if self._scheduler_task:
             await self._scheduler_task
+        # Drop the reference so a stopped coordinator can be collected
+        metrics.RT_QUEUE_DEPTH.set_function(lambda: 0)
         logger.info("realtime_coordinator_stopped")
 
     def register_task(
@@ -90,8 +107,11 @@ class RealTimeCoordinator:
     ) -> RealtimeTaskHandle:
         if config.name in self._handles:
             raise ValueError(f"Task {config.name} already registered")
-        start_time = self._loop.time() + config.period_seconds
+        start_time = self._get_loop().time() + config.period_seconds
         handle = RealtimeTaskHandle(config=config, coroutine_factory=coroutine_factory, next_run=start_time)
+        handle._observe_latency = metrics.task_latency_histogram(config.name).observe
+        handle._observe_jitter = metrics.task_jitter_histogram(config.name).observe
+        handle._inc_deadline = metrics.task_deadline_counter(config.name).inc
         self._handles[config.name] = handle
         self._push(handle)
         self._wakeup.set()
@@ -102,20 +122,30 @@ class RealTimeCoordinator:
         handle = self._handles.get(task_name)
         if not handle:
             raise KeyError(f"Task {task_name} not registered")
-        handle.next_run = self._loop.time()
+        handle.next_run = self._get_loop().time()
         self._push(handle)
         self._wakeup.set()
         logger.warning("rt_task_immediate_run", task=task_name)
 
+    def _live_task_count(self) -> int:
+        # The heap also holds stale entries, so its length overstates the load
+        return sum(1 for handle in self._handles.values() if not handle.cancelled)
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
     async def _schedule_loop(self) -> None:
+        _time = self._loop.time
         while self._running:
             if not self._queue:
                 self._wakeup.clear()
                 await self._wakeup.wait()
                 continue
 
-            next_run, _, _, handle = self._queue[0]
-            now = self._loop.time()
+            next_run = self._queue[0][0]
+            now = _time()
             delay = max(0.0, next_run - now)
             if delay > 0:
                 try:
@@ -125,15 +155,26 @@ class RealTimeCoordinator:
                 except asyncio.TimeoutError:
                     pass
 
-            heapq.heappop(self._queue)
-            if handle.cancelled:
+            # Re-read the head: a wakeup may have raced the timeout
+            scheduled_start, _, _, generation, handle = self._queue[0]
+            if handle.cancelled or generation != handle._generation:
+                heapq.heappop(self._queue)
                 continue
-            self._loop.create_task(self._execute(handle))
-
-    async def _execute(self, handle: RealtimeTaskHandle) -> None:
+            if handle.config.inline:
+                # The scheduler is busy until this run finishes, so the next tick
+                # can be queued up front, popping this entry in the same siftdown
+                handle.next_run = self._next_period(scheduled_start, handle.config.period_seconds, _time())
+                self._replace_top(handle)
+                await self._execute(handle, scheduled_start, reschedule=False)
+            else:
+                # Reschedule only once the run completes so ticks never overlap
+                heapq.heappop(self._queue)
+                self._loop.create_task(self._execute(handle, scheduled_start, reschedule=True))
+
+    async def _execute(self, handle: RealtimeTaskHandle, scheduled_start: float, *, reschedule: bool) -> None:
+        _time = self._loop.time
         config = handle.config
-        scheduled_start = handle.next_run
-        jitter = (self._loop.time() - scheduled_start) * 1000.0
+        jitter = (_time() - scheduled_start) * 1000.0
         task_latency = 0.0
         deadline_missed = False
         try:
@@ -141,26 +182,44 @@ class RealTimeCoordinator:
         except Exception as exc:  # pragma: no cover - log path
             logger.exception("rt_task_exception", task=config.name, error=str(exc))
         finally:
-            finished = self._loop.time()
+            finished = _time()
             task_latency = (finished - scheduled_start) * 1000.0
             if (finished - scheduled_start) > config.deadline_seconds:
                 deadline_missed = True
-                metrics.task_deadline_counter(config.name).inc()
-                logger.warning("rt_task_deadline_miss", task=config.name, latency_ms=task_latency)
-            metrics.task_latency_histogram(config.name).observe(task_latency)
-            metrics.task_jitter_histogram(config.name).observe(max(jitter, 0.0))
+                handle._inc_deadline()
+                # An inline overrun also held up every other task's tick
+                logger.warning(
+                    "rt_task_deadline_miss", task=config.name, latency_ms=task_latency, inline=config.inline
+                )
+            handle._observe_latency(task_latency)
+            handle._observe_jitter(max(jitter, 0.0))
             handle.last_stats = RealtimeTaskStats(jitter_ms=jitter, latency_ms=task_latency, deadline_missed=deadline_missed)
-            handle.next_run = scheduled_start + config.period_seconds
-            if not handle.cancelled:
+            if reschedule and not handle.cancelled:
+                handle.next_run = self._next_period(scheduled_start, config.period_seconds, finished)
                 self._push(handle)
                 self._wakeup.set()
 
+    @staticmethod
+    def _next_period(scheduled_start: float, period: float, now: float) -> float:
+        next_run = scheduled_start + period
+        # Skip periods missed during an overrun instead of firing them back-to-back
+        while next_run <= now:
+            next_run += period
+        return next_run
+
     def _push(self, handle: RealtimeTaskHandle) -> None:
+        handle._generation += 1
         heapq.heappush(
             self._queue,
-            (handle.next_run, handle.config.priority, next(self._seq), handle),
+            (handle.next_run, handle.config.priority, next(self._seq), handle._generation, handle),
+        )
+
+    def _replace_top(self, handle: RealtimeTaskHandle) -> None:
+        handle._generation += 1
+        heapq.heapreplace(
+            self._queue,
+            (handle.next_run, handle.config.priority, next(self._seq), handle._generation, handle),
         )
-        metrics.task_backlog_gauge(handle.config.name).set(len(self._queue))
 
     def get_handle(self, task_name: str) -> Optional[RealtimeTaskHandle]:
         return self._handles.get(task_name)
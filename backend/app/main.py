@@ -3,38 +3,88 @@ from __future__ import annotations
 import asyncio
 import base64
 import json
-import logging
 from contextlib import asynccontextmanager
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-from fastapi import FastAPI, WebSocket
+import orjson
+import structlog
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.websockets import WebSocketState
 
 from .api import commands
 from .core.config import Settings, get_settings
-from .core.event_bus import EventBus
+from .core.event_bus import BroadcastBuffer, EventBus
 from .core.realtime import RealTimeCoordinator, RealtimeTaskConfig
 from .deps import get_event_bus, get_realtime_coordinator
 from .services.bridges.worker_bridge import WorkerBridge
+from .services.hardware.meca500 import Meca500Controller
+from .services.hardware.pdxc2 import PDXC2Controller, set_kinesis_dll_path
 
-logger = logging.getLogger(__name__)
+logger = structlog.get_logger(__name__)
 
+# /ws/telemetry micro-batching: coalescing window, and cap on payloads per frame (oldest dropped)
+TELEMETRY_BATCH_LINGER_SEC = 0.005
+TELEMETRY_BATCH_MAX = 64
+# Offered by clients that expect binary JSON frames on /ws/telemetry
+TELEMETRY_SUBPROTOCOL = "binary.telemetry.v1"
+# Shared by all /ws/telemetry clients; each client keeps its own read cursor
+TELEMETRY_BUFFER_CAPACITY = 256
+# Frames are latest-wins; a slow client should skip ahead, not replay a backlog
+CAMERA_WS_MAX_QUEUE = 2
+# Constant envelope head; payloads arrive pre-encoded, so a frame is a byte join
+_TELEMETRY_FRAME_PREFIX = orjson.dumps({"topic": "telemetry/realtime"})[:-1] + b',"batch":['
+_TELEMETRY_FRAME_SUFFIX = b"]}"
+
+try:
+    import uvloop
+except ImportError:  # uvloop has no Windows build; keep the default asyncio loop
+    uvloop = None
+else:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
+def _telemetry_task_factory(buffer: BroadcastBuffer) -> Callable[[], Awaitable[None]]:
+    # Resolved once here (factory runs inside the lifespan) rather than per tick
+    clock = asyncio.get_running_loop().time
+    template: Dict[str, Any] = {"type": "coordinator"}
 
-def _telemetry_task_factory(event_bus: EventBus) -> Callable[[], Awaitable[None]]:
     async def _task() -> None:
-        payload: Dict[str, Any] = {
-            "type": "coordinator",
-            "timestamp": asyncio.get_running_loop().time(),
-        }
-        await event_bus.publish("telemetry/realtime", payload)
+        # Encoded once here rather than once per connected client
+        buffer.publish(orjson.dumps({**template, "timestamp": clock()}))
 
     return _task
 
 
+async def _close_websocket(websocket: WebSocket) -> None:
+    # Skip the close round-trip when the client already hung up; a close that
+    # races the peer raises RuntimeError, anything else should propagate
+    if websocket.client_state == WebSocketState.DISCONNECTED:
+        return
+    try:
+        await websocket.close()
+    except RuntimeError:
+        pass
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings: Settings = get_settings()
+    # Device controllers are singletons for the app's lifetime (see api.commands.get_*)
+    meca500 = Meca500Controller(address=settings.meca500_address)
+    set_kinesis_dll_path(settings.kinesis_dll_path)
+    pdxc2: Optional[PDXC2Controller] = None
+    try:
+        # Loads the Kinesis .NET DLLs once here; hosts without them run without the stage
+        pdxc2 = PDXC2Controller(
+            serial_number=settings.pdxc2_serial,
+            poll_interval_ms=settings.pdxc2_poll_interval_ms,
+        )
+    except Exception as exc:
+        logger.warning("pdxc2_unavailable", error_msg=str(exc))
+
     event_bus = EventBus()
+    telemetry_buffer = BroadcastBuffer(capacity=TELEMETRY_BUFFER_CAPACITY)
     coordinator = RealTimeCoordinator()
     await coordinator.start()
     coordinator.register_task(
@@ -44,8 +94,9 @@ async def lifespan(app: FastAPI):
             deadline_ms=5,
             max_jitter_ms=1,
             priority=10,
+            inline=True,  # a single buffer append; not worth a Task per tick
         ),
-        coroutine_factory=_telemetry_task_factory(event_bus),
+        coroutine_factory=_telemetry_task_factory(telemetry_buffer),
     )
     
     # Initialize worker bridge and start camera + sensor workers
@@ -84,19 +135,26 @@ async def lifespan(app: FastAPI):
         print(f"[Main] Failed to start Bota sensor worker: {exc}")
     
     app.state.settings = settings
+    app.state.meca500 = meca500
+    app.state.pdxc2 = pdxc2
     app.state.event_bus = event_bus
+    app.state.telemetry_buffer = telemetry_buffer
     app.state.coordinator = coordinator
     app.state.worker_bridge = worker_bridge
     try:
         yield
     finally:
         # Disconnect Meca500 if connected (prevents stale TCP sessions)
-        from .api.commands import _meca500_controller
-        if _meca500_controller is not None:
+        try:
+            await meca500.disconnect()
+        except Exception as exc:
+            logger.warning("meca500_disconnect_failed", error_msg=str(exc))
+        if pdxc2 is not None:
+            # A failed disconnect must not skip worker shutdown below
             try:
-                await _meca500_controller.disconnect()
-            except Exception:
-                pass
+                await pdxc2.disconnect()
+            except Exception as exc:
+                logger.warning("pdxc2_disconnect_failed", error_msg=str(exc))
         await worker_bridge.shutdown()
         await coordinator.stop()
 
@@ -104,9 +162,12 @@ async def lifespan(app: FastAPI):
 def create_app() -> FastAPI:
     application = FastAPI(title="Precision Control Backend", lifespan=lifespan)
 
+    # Explicit origins: a wildcard with credentials is spec-invalid and makes
+    # Starlette reflect the Origin header per request. WebSocket scopes pass
+    # through CORSMiddleware untouched, so /ws/* is unaffected.
     application.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
+        allow_origins=sorted(frozenset(get_settings().cors_origins)),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
@@ -137,29 +198,31 @@ def create_app() -> FastAPI:
 
     @application.websocket("/ws/telemetry")
     async def websocket_telemetry(websocket: WebSocket) -> None:
-        await websocket.accept()
-        event_bus: EventBus = application.state.event_bus
+        # Only echo the subprotocol if the client offered it; browsers reject unrequested ones
+        offered = websocket.scope.get("subprotocols", ())
+        await websocket.accept(subprotocol=TELEMETRY_SUBPROTOCOL if TELEMETRY_SUBPROTOCOL in offered else None)
+        telemetry_buffer: BroadcastBuffer = application.state.telemetry_buffer
         try:
-            async for payload in event_bus.subscribe("telemetry/realtime"):
-                message = {"topic": "telemetry/realtime", "payload": payload}
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    break  # Client disconnected, exit gracefully
+            # Coalesce bursts into one binary frame: {"topic": ..., "batch": [payload, ...]}
+            async for batch in telemetry_buffer.subscribe(
+                max_batch=TELEMETRY_BATCH_MAX,
+                linger=TELEMETRY_BATCH_LINGER_SEC,
+            ):
+                frame = _TELEMETRY_FRAME_PREFIX + b",".join(batch) + _TELEMETRY_FRAME_SUFFIX
+                await websocket.send_bytes(frame)
+        except WebSocketDisconnect:
+            pass  # Client went away; nothing to report
         except Exception as exc:
             logger.error("ws_telemetry_error", error_msg=str(exc))
         finally:
-            try:
-                await websocket.close()
-            except Exception:
-                pass  # Already closed
+            await _close_websocket(websocket)
 
     @application.websocket("/ws/camera/{worker_name}")
     async def websocket_camera(websocket: WebSocket, worker_name: str) -> None:
         await websocket.accept()
         event_bus: EventBus = application.state.event_bus
         try:
-            async for payload in event_bus.subscribe(f"worker/{worker_name}/frame"):
+            async for payload in event_bus.subscribe(f"worker/{worker_name}/frame", max_queue=CAMERA_WS_MAX_QUEUE):
                 # Encode frame data as base64 for JSON transmission
                 frame_data = base64.b64encode(payload.data).decode("utf-8")
                 message = {
@@ -171,17 +234,13 @@ def create_app() -> FastAPI:
                         "timestamp": payload.monotonic_ts,
                     },
                 }
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    break
+                await websocket.send_json(message)
+        except WebSocketDisconnect:
+            pass
         except Exception as exc:
             logger.error("ws_camera_error", error_msg=str(exc))
         finally:
-            try:
-                await websocket.close()
-            except Exception:
-                pass
+            await _close_websocket(websocket)
 
     @application.websocket("/ws/sensor/{worker_name}")
     async def websocket_sensor(websocket: WebSocket, worker_name: str) -> None:
@@ -194,17 +253,13 @@ def create_app() -> FastAPI:
                     "topic": f"worker/{worker_name}/ft_sample",
                     "payload": payload.metadata or {},
                 }
-                try:
-                    await websocket.send_json(message)
-                except Exception:
-                    break
+                await websocket.send_json(message)
+        except WebSocketDisconnect:
+            pass
         except Exception as exc:
             logger.error("ws_sensor_error", error_msg=str(exc))
         finally:
-            try:
-                await websocket.close()
-            except Exception:
-                pass
+            await _close_websocket(websocket)
 
     return application
 
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import structlog
 
 from ...core.event_bus import EventBus
-from ...core.realtime import RealTimeCoordinator, RealtimeTaskConfig
+from ...core.realtime import RealTimeCoordinator
 from ...shared.schemas import WorkerPayload
 from ...worker.process_manager import WorkerProcessManager, WorkerSpec
 
 logger = structlog.get_logger(__name__)
 
+# Camera frames travel through a shared-memory ring of queue_size + 2 slots;
+# JPEGs from the (<=800 px wide) stream fit easily, larger ones go inline.
+# A camera config may size slots to its expected JPEG size via "max_jpeg_bytes".
+CAMERA_QUEUE_SIZE = 8
+CAMERA_FRAME_SLOT_BYTES = 1 << 20
+
 
 class WorkerBridge:
     """Coordinates isolated worker processes and republishes their telemetry."""
@@ -19,16 +25,12 @@ class WorkerBridge:
         self._event_bus = event_bus
         self._manager = WorkerProcessManager(payload_handler=self._handle_payload)
         self._coordinator: RealTimeCoordinator | None = None
+        self._topics: Dict[Tuple[str, str], str] = {}
 
     async def attach_coordinator(self, coordinator: RealTimeCoordinator) -> None:
+        # No periodic health task: heartbeats are already exported per worker
+        # through the worker_heartbeat_timestamp gauge as they arrive
         self._coordinator = coordinator
-        config = RealtimeTaskConfig(
-            name="worker_health_check",
-            period_ms=200,
-            deadline_ms=2,
-            priority=5,
-        )
-        coordinator.register_task(config, self._health_check_task)
 
     async def start_camera_worker(self, camera_config: Dict[str, Any]) -> None:
         """Start a named Basler camera worker. Config must include 'name'."""
@@ -37,6 +39,9 @@ class WorkerBridge:
             name=worker_name,
             target="app.worker.workers.camera_worker:run",
             config=camera_config,
+            # Frames are latest-wins downstream; a short queue bounds the shared-memory ring
+            queue_size=CAMERA_QUEUE_SIZE,
+            frame_slot_bytes=int(camera_config.get("max_jpeg_bytes", CAMERA_FRAME_SLOT_BYTES)),
         )
         await self._manager.start_worker(spec)
 
@@ -54,9 +59,10 @@ class WorkerBridge:
         await self._manager.shutdown()
 
     async def _handle_payload(self, payload: WorkerPayload) -> None:
-        topic = f"worker/{payload.worker}/{payload.payload_type.value}"
-        await self._event_bus.publish(topic, payload)
-
-    async def _health_check_task(self):
-        # Health data checked internally; no per-tick logging
-        self._manager.snapshot()
+        # Republished by reference: frame bytes are never copied, measured or
+        # revalidated here; only subscribers that send a frame touch its data
+        key = (payload.worker, payload.payload_type)
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = f"worker/{payload.worker}/{payload.payload_type.value}"
+        self._event_bus.publish(topic, payload)
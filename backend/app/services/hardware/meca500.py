@@ -1,14 +1,36 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional, Tuple
-
-import mecademicpy.robot as mdr
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, TypeVar
 
 import structlog
 
+if TYPE_CHECKING:
+    import mecademicpy.robot as mdr
+
 logger = structlog.get_logger(__name__)
 
+_T = TypeVar("_T")
+
+# Concurrent status/pose/joints reads within this window share one robot query
+_READ_CACHE_TTL_SEC = 0.02
+
+# Getters served through _cached_read; bound once per Robot instance
+_CACHED_READS = ("GetJoints", "GetPose", "GetStatusRobot")
+
+# Longest a single Wait* call may hold the robot I/O thread; longer waits are
+# split into slices so reads and ClearMotion/PauseMotion run in between
+_WAIT_SLICE_SEC = 0.05
+
+_ZERO_JOINTS = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+# Key order matches the (x, y, z, alpha, beta, gamma) tuple from Robot.GetPose
+_POSE_KEYS = ("x", "y", "z", "alpha", "beta", "gamma")
+
 
 class Meca500Controller:
     """
@@ -19,23 +41,140 @@ class Meca500Controller:
     - Provides callbacks for state changes
     - Implements proper error handling and recovery
     - Manages connection lifecycle
+    - Runs all blocking robot calls on one dedicated I/O thread
     """
 
     def __init__(self, address: str = "192.168.0.100", enable_callbacks: bool = True):
         self.address = address
         self.robot: Optional[mdr.Robot] = None
+        # mecademicpy is imported on first robot use, keeping it off the startup path
+        self._mdr: Optional[ModuleType] = None
+        # Bound methods of the current Robot, refreshed whenever it is rebuilt
+        self._read_fns: Dict[str, Callable[[], Any]] = {}
+        self._move_joints: Optional[Callable[..., Any]] = None
+        self._set_io: Optional[Callable[..., Any]] = None
+        self._get_io: Optional[Callable[..., Any]] = None
         self.enable_callbacks = enable_callbacks
         self._connected = False
         self._activated = False
         self._homed = False
         self._error_state = False
+        # Created on first robot call and shut down by disconnect()
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        self._read_cache: Dict[str, Tuple[float, Any]] = {}
+        self._read_locks: Dict[str, asyncio.Lock] = {}
+        self._command_epoch = 0
+        # Mirrors of the activated/homed flags that coroutines can await; driven
+        # by robot callbacks once _register_callbacks has bound the event loop
+        self._activated_event = asyncio.Event()
+        self._deactivated_event = asyncio.Event()
+        self._homed_event = asyncio.Event()
+        self._callback_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _submit(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        """Run a blocking robot call on the controller's dedicated I/O thread.
+
+        One long-lived thread owns all robot I/O, so calls are serialized and
+        polling does not fan out across the default executor.
+        """
+        self._read_cache.clear()
+        self._command_epoch += 1
+        return await self._run_io(fn, *args, **kwargs)
+
+    async def _run_io(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="meca500-io")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, functools.partial(fn, *args, **kwargs))
+
+    async def _cached_read(self, method: str) -> Any:
+        """Call a no-arg robot getter, sharing one round-trip per TTL window.
+
+        Bursts of concurrent readers (health probes, UI polls) coalesce on a
+        per-method lock; any other robot call made through ``_submit`` clears
+        the cache so reads never outlive a command.
+        """
+        cached = self._read_cache.get(method)
+        if cached is not None and (time.monotonic() - cached[0]) < _READ_CACHE_TTL_SEC:
+            return cached[1]
+        lock = self._read_locks.setdefault(method, asyncio.Lock())
+        async with lock:
+            cached = self._read_cache.get(method)
+            if cached is not None and (time.monotonic() - cached[0]) < _READ_CACHE_TTL_SEC:
+                return cached[1]
+            epoch = self._command_epoch
+            self._ensure_robot()
+            value = await self._run_io(self._read_fns[method])
+            if epoch == self._command_epoch:  # don't cache a reply a command overtook
+                self._read_cache[method] = (time.monotonic(), value)
+            return value
+
+    async def _wait_sliced(self, wait_fn: Callable[..., Any], timeout: float) -> None:
+        """Run a mecademicpy ``Wait*`` call without parking the I/O thread.
+
+        The wait is issued in ``_WAIT_SLICE_SEC`` slices and each slice gives
+        the thread back, so queued robot calls interleave with a long wait.
+        Raises asyncio.TimeoutError once ``timeout`` seconds have passed.
+        """
+        self._ensure_robot()
+        timeout_error = self._mdr.TimeoutException
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                await self._run_io(wait_fn, timeout=min(_WAIT_SLICE_SEC, remaining))
+                return
+            except timeout_error:
+                continue
+
+    async def _await_state(self, event: asyncio.Event, reached: Callable[[Any], bool], timeout: float) -> None:
+        """Await a state event the caller cleared before sending its command.
+
+        Callbacks only fire on transitions, so when the robot already reports
+        the state (Home() on a homed robot) there is nothing left to wait for.
+        """
+        status = await self._run_io(self._ensure_robot().GetStatusRobot)
+        if not reached(status):
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+
+    def _sync_state_events(self) -> None:
+        """Bring the awaitable state events in line with the state flags (loop thread only)."""
+        for event, state in (
+            (self._activated_event, self._activated),
+            (self._deactivated_event, not self._activated),
+            (self._homed_event, self._homed),
+        ):
+            if state:
+                event.set()
+            else:
+                event.clear()
+
+    def _notify_state_change(self) -> None:
+        """Called from the mecademicpy callback thread after a state flag changes."""
+        loop = self._callback_loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._sync_state_events)
 
     def _ensure_robot(self) -> mdr.Robot:
         """Lazily create the Robot instance."""
         if self.robot is None:
-            self.robot = mdr.Robot()
+            if self._mdr is None:
+                import mecademicpy.robot as mdr
+
+                self._mdr = mdr
+            self.robot = self._mdr.Robot()
+            self._bind_robot_methods(self.robot)
         return self.robot
 
+    def _bind_robot_methods(self, robot: mdr.Robot) -> None:
+        """Resolve hot-path Robot methods once instead of on every call."""
+        self._read_fns = {name: getattr(robot, name) for name in _CACHED_READS}
+        self._move_joints = robot.MoveJoints
+        self._set_io = robot.SetIO
+        self._get_io = robot.GetIO
+
     async def connect(self) -> bool:
         """Connect to the Meca500 robot.
 
@@ -45,7 +184,7 @@ class Meca500Controller:
         for attempt in range(2):
             try:
                 robot = self._ensure_robot()
-                await asyncio.to_thread(robot.Connect, address=self.address, timeout=5)
+                await self._submit(robot.Connect, address=self.address, timeout=5)
                 self._connected = True
                 logger.info("meca500_connected", address=self.address)
 
@@ -59,10 +198,11 @@ class Meca500Controller:
                     logger.warning("meca500_busy_retry", error=err_str)
                     # Destroy old object so a fresh TCP socket is used
                     try:
-                        self.robot.Disconnect()
+                        await self._submit(self.robot.Disconnect)
                     except Exception:
                         pass
                     self.robot = None
+                    self._callback_loop = None
                     await asyncio.sleep(2)
                     continue
                 logger.error("meca500_connect_failed", error=err_str, address=self.address)
@@ -71,16 +211,21 @@ class Meca500Controller:
 
     async def disconnect(self) -> None:
         """Disconnect from the Meca500 robot."""
-        if self.robot is None:
-            return
         try:
-            await asyncio.to_thread(self.robot.Disconnect)
-            self._connected = False
-            self._activated = False
-            self._homed = False
-            logger.info("meca500_disconnected")
+            if self.robot is not None:
+                await self._submit(self.robot.Disconnect)
+                self._callback_loop = None
+                self._connected = False
+                self._activated = False
+                self._homed = False
+                logger.info("meca500_disconnected")
         except Exception as e:
             logger.error("meca500_disconnect_failed", error=str(e))
+        finally:
+            if self._io_executor is not None:
+                # Recreated by the next robot call if the controller reconnects
+                self._io_executor.shutdown(wait=False)
+                self._io_executor = None
 
     async def activate_and_home(self) -> dict:
         """
@@ -102,20 +247,20 @@ class Meca500Controller:
             
             # Check safety status before trying to activate
             try:
-                safety = await asyncio.to_thread(robot.GetSafetyStatus)
+                safety = await self._submit(robot.GetSafetyStatus)
                 if safety and safety.stop_mask != 0:
                     # Try automatic reset first
                     logger.info("meca500_safety_stop_detected", stop_mask=safety.stop_mask, reset_ready=safety.reset_ready)
-                    await asyncio.to_thread(robot.ResetError)
+                    await self._submit(robot.ResetError)
                     await asyncio.sleep(0.5)
                     try:
-                        await asyncio.to_thread(robot.ResetPStop2)
+                        await self._submit(robot.ResetPStop2)
                         await asyncio.sleep(1)
                     except Exception:
                         pass
                     
                     # Re-check
-                    safety = await asyncio.to_thread(robot.GetSafetyStatus)
+                    safety = await self._submit(robot.GetSafetyStatus)
                     if safety and safety.stop_mask != 0:
                         # Safety stop still active — manual reset required
                         conditions = []
@@ -135,13 +280,19 @@ class Meca500Controller:
             except Exception as e:
                 logger.warning("meca500_safety_check_failed", error=str(e))
 
-            await asyncio.to_thread(robot.ActivateAndHome)
-            # Wait for activation to complete
-            await asyncio.to_thread(robot.WaitActivated, timeout=10)
-            self._activated = True
-            # Wait for homing to complete
-            await asyncio.to_thread(robot.WaitHomed, timeout=10)
-            self._homed = True
+            # A set event may predate this command; only a fresh callback counts
+            self._activated_event.clear()
+            self._homed_event.clear()
+            await self._submit(robot.ActivateAndHome)
+            if self._callback_loop is not None:
+                # Await the callbacks instead of waiting on the robot I/O thread
+                await self._await_state(self._activated_event, lambda status: status.activation_state, 10)
+                await self._await_state(self._homed_event, lambda status: status.homing_state, 10)
+            else:
+                await self._wait_sliced(robot.WaitActivated, 10)
+                self._activated = True
+                await self._wait_sliced(robot.WaitHomed, 10)
+                self._homed = True
             logger.info("meca500_activated_and_homed")
             return {"success": True}
         except Exception as e:
@@ -160,8 +311,12 @@ class Meca500Controller:
         """Deactivate the robot."""
         try:
             robot = self._ensure_robot()
-            await asyncio.to_thread(robot.DeactivateRobot)
-            await asyncio.to_thread(robot.WaitDeactivated, timeout=5)
+            self._deactivated_event.clear()
+            await self._submit(robot.DeactivateRobot)
+            if self._callback_loop is not None:
+                await self._await_state(self._deactivated_event, lambda status: not status.activation_state, 5)
+            else:
+                await self._wait_sliced(robot.WaitDeactivated, 5)
             self._activated = False
             self._homed = False
             logger.info("meca500_deactivated")
@@ -174,8 +329,12 @@ class Meca500Controller:
         """Perform homing sequence."""
         try:
             robot = self._ensure_robot()
-            await asyncio.to_thread(robot.Home)
-            await asyncio.to_thread(robot.WaitHomed, timeout=10)
+            self._homed_event.clear()
+            await self._submit(robot.Home)
+            if self._callback_loop is not None:
+                await self._await_state(self._homed_event, lambda status: status.homing_state, 10)
+            else:
+                await self._wait_sliced(robot.WaitHomed, 10)
             self._homed = True
             logger.info("meca500_homed")
             return True
@@ -186,7 +345,8 @@ class Meca500Controller:
     async def move_joints(self, j1: float, j2: float, j3: float, j4: float, j5: float, j6: float) -> bool:
         """Move to specified joint angles (degrees)."""
         try:
-            await asyncio.to_thread(self._ensure_robot().MoveJoints, j1, j2, j3, j4, j5, j6)
+            self._ensure_robot()
+            await self._submit(self._move_joints, j1, j2, j3, j4, j5, j6)
             logger.debug("meca500_move_joints_sent", joints=[j1, j2, j3, j4, j5, j6])
             return True
         except Exception as e:
@@ -199,11 +359,11 @@ class Meca500Controller:
             robot = self._ensure_robot()
             move_fn = getattr(robot, "MovePose", None)
             if callable(move_fn):
-                await asyncio.to_thread(move_fn, x, y, z, alpha, beta, gamma)
+                await self._submit(move_fn, x, y, z, alpha, beta, gamma)
             else:
                 # Fallback: send custom command string (device-specific)
                 cmd = f"MovePose {x} {y} {z} {alpha} {beta} {gamma}"
-                await asyncio.to_thread(robot.SendCustomCommand, cmd)
+                await self._submit(robot.SendCustomCommand, cmd)
             logger.debug("meca500_move_to_pose", pose=[x, y, z, alpha, beta, gamma])
             return True
         except Exception as e:
@@ -255,11 +415,15 @@ class Meca500Controller:
 
             if not self._activated:
                 activated = await self.activate_and_home()
-                if not activated:
+                if not activated.get("success"):
                     logger.error("meca500_zero_joints_not_activated")
                     return False
 
-            return await self.move_joints(0, 0, 0, 0, 0, 0)
+            # Issued directly rather than through move_joints(), which rebuilds its log list per call
+            self._ensure_robot()
+            await self._submit(self._move_joints, *_ZERO_JOINTS)
+            logger.debug("meca500_move_joints_sent", joints=_ZERO_JOINTS)
+            return True
         except Exception as e:
             logger.error("meca500_zero_joints_failed", error=str(e))
             return False
@@ -267,7 +431,7 @@ class Meca500Controller:
     async def get_joints(self) -> Optional[Tuple[float, float, float, float, float, float]]:
         """Get current joint positions."""
         try:
-            joints = await asyncio.to_thread(self._ensure_robot().GetJoints)
+            joints = await self._cached_read("GetJoints")
             logger.debug("meca500_joints_read", joints=joints)
             return tuple(joints) if joints else None
         except Exception as e:
@@ -277,41 +441,64 @@ class Meca500Controller:
     async def get_pose(self) -> Optional[dict]:
         """Get current Cartesian pose (position + orientation)."""
         try:
-            pose = await asyncio.to_thread(self._ensure_robot().GetPose)
+            pose = await self._cached_read("GetPose")
             if pose:
-                return {
-                    "x": pose[0],
-                    "y": pose[1],
-                    "z": pose[2],
-                    "alpha": pose[3],
-                    "beta": pose[4],
-                    "gamma": pose[5],
-                }
+                return dict(zip(_POSE_KEYS, pose))
             return None
         except Exception as e:
             logger.error("meca500_get_pose_failed", error=str(e))
             return None
 
+    def _status_dict(self, status: Any) -> dict:
+        return {
+            "connected": self._connected,
+            "activated": self._activated,
+            "homed": self._homed,
+            "is_moving": status.motion_status if status else False,
+            "error": status.error_status if status else False,
+            "paused": status.pause_motion_status if status else False,
+        }
+
     async def get_status(self) -> Optional[dict]:
         """Get robot status (connection, activation, error state, etc.)."""
         try:
-            status = await asyncio.to_thread(self._ensure_robot().GetStatusRobot)
-            return {
-                "connected": self._connected,
-                "activated": self._activated,
-                "homed": self._homed,
-                "is_moving": status.motion_status if status else False,
-                "error": status.error_status if status else False,
-                "paused": status.pause_motion_status if status else False,
-            }
+            return self._status_dict(await self._cached_read("GetStatusRobot"))
         except Exception as e:
             logger.error("meca500_get_status_failed", error=str(e))
             return None
 
+    def _read_state_sync(self) -> Tuple[Any, Any, Any]:
+        read = self._read_fns
+        return read["GetPose"](), read["GetJoints"](), read["GetStatusRobot"]()
+
+    async def get_state(self) -> Tuple[Optional[dict], Optional[Tuple[float, ...]], Optional[dict]]:
+        """Get pose, joints and status together in one I/O-thread hop.
+
+        The three getters share the single robot I/O thread, so gathering
+        them would still run them one after another; fusing them saves two
+        executor round-trips and reads them from the same instant.
+        """
+        try:
+            self._ensure_robot()
+            epoch = self._command_epoch
+            pose, joints, status = await self._run_io(self._read_state_sync)
+            if epoch == self._command_epoch:  # same rule as _cached_read
+                now = time.monotonic()
+                for method, value in zip(("GetPose", "GetJoints", "GetStatusRobot"), (pose, joints, status)):
+                    self._read_cache[method] = (now, value)
+            return (
+                dict(zip(_POSE_KEYS, pose)) if pose else None,
+                tuple(joints) if joints else None,
+                self._status_dict(status),
+            )
+        except Exception as e:
+            logger.error("meca500_get_state_failed", error=str(e))
+            return None, None, None
+
     async def reset_error(self) -> bool:
         """Reset robot error state."""
         try:
-            await asyncio.to_thread(self._ensure_robot().ResetError)
+            await self._submit(self._ensure_robot().ResetError)
             self._error_state = False
             logger.info("meca500_error_reset")
             return True
@@ -322,7 +509,7 @@ class Meca500Controller:
     async def wait_idle(self, timeout: float = 30.0) -> bool:
         """Wait for robot to complete all motions."""
         try:
-            await asyncio.to_thread(self._ensure_robot().WaitIdle, timeout=timeout)
+            await self._wait_sliced(self._ensure_robot().WaitIdle, timeout)
             logger.debug("meca500_wait_idle_complete")
             return True
         except asyncio.TimeoutError:
@@ -335,7 +522,7 @@ class Meca500Controller:
     async def clear_motion(self) -> bool:
         """Clear the motion queue immediately."""
         try:
-            await asyncio.to_thread(self._ensure_robot().ClearMotion)
+            await self._submit(self._ensure_robot().ClearMotion)
             logger.warning("meca500_motion_cleared")
             return True
         except Exception as e:
@@ -345,7 +532,7 @@ class Meca500Controller:
     async def pause_motion(self) -> bool:
         """Pause ongoing motion."""
         try:
-            await asyncio.to_thread(self._ensure_robot().PauseMotion)
+            await self._submit(self._ensure_robot().PauseMotion)
             logger.info("meca500_motion_paused")
             return True
         except Exception as e:
@@ -355,7 +542,7 @@ class Meca500Controller:
     async def resume_motion(self) -> bool:
         """Resume paused motion."""
         try:
-            await asyncio.to_thread(self._ensure_robot().ResumeMotion)
+            await self._submit(self._ensure_robot().ResumeMotion)
             logger.info("meca500_motion_resumed")
             return True
         except Exception as e:
@@ -369,7 +556,7 @@ class Meca500Controller:
         This is for advanced usage or testing; prefer specific methods when available.
         """
         try:
-            response = await asyncio.to_thread(self._ensure_robot().SendCustomCommand, command)
+            response = await self._submit(self._ensure_robot().SendCustomCommand, command)
             logger.debug("meca500_custom_command", command=command, response=str(response))
             return str(response) if response else "OK"
         except Exception as e:
@@ -390,7 +577,8 @@ class Meca500Controller:
         """
         try:
             # SetIO(bank, pin, state)
-            await asyncio.to_thread(self._ensure_robot().SetIO, bank, pin, state)
+            self._ensure_robot()
+            await self._submit(self._set_io, bank, pin, state)
             logger.info("meca500_valve_set", bank=bank, pin=pin, state=state)
             return True
         except Exception as e:
@@ -410,7 +598,8 @@ class Meca500Controller:
         """
         try:
             # GetIO(bank, pin) returns the state
-            state = await asyncio.to_thread(self._ensure_robot().GetIO, bank, pin)
+            self._ensure_robot()
+            state = await self._submit(self._get_io, bank, pin)
             logger.debug("meca500_valve_state_read", bank=bank, pin=pin, state=state)
             return bool(state)
         except Exception as e:
@@ -419,7 +608,8 @@ class Meca500Controller:
 
     async def _register_callbacks(self) -> None:
         """Register callback handlers for robot state changes."""
-        callbacks = mdr.RobotCallbacks()
+        robot = self._ensure_robot()
+        callbacks = self._mdr.RobotCallbacks()
 
         def on_connected():
             logger.info("meca500_callback_connected")
@@ -430,19 +620,23 @@ class Meca500Controller:
             self._connected = False
             self._activated = False
             self._homed = False
+            self._notify_state_change()
 
         def on_activated():
             logger.info("meca500_callback_activated")
             self._activated = True
+            self._notify_state_change()
 
         def on_deactivated():
             logger.info("meca500_callback_deactivated")
             self._activated = False
             self._homed = False
+            self._notify_state_change()
 
         def on_homed():
             logger.info("meca500_callback_homed")
             self._homed = True
+            self._notify_state_change()
 
         def on_error():
             logger.error("meca500_callback_error")
@@ -455,11 +649,21 @@ class Meca500Controller:
         callbacks.on_homed = on_homed
         callbacks.on_error = on_error
 
-        await asyncio.to_thread(
-            self._ensure_robot().RegisterCallbacks,
+        await self._submit(
+            robot.RegisterCallbacks,
             callbacks=callbacks,
             run_callbacks_in_separate_thread=True,
         )
+        # Seed the events from the robot's current state: callbacks only fire on
+        # transitions, and Home() on an already-homed robot reports no change
+        try:
+            status = await self._run_io(robot.GetStatusRobot)
+            self._activated = bool(status.activation_state)
+            self._homed = bool(status.homing_state)
+        except Exception as e:
+            logger.warning("meca500_initial_status_failed", error=str(e))
+        self._sync_state_events()
+        self._callback_loop = asyncio.get_running_loop()
 
     async def __aenter__(self):
         """Context manager entry."""
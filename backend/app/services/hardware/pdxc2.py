@@ -6,17 +6,21 @@ of PDX1/M piezo stages. Supports both open-loop (step-based) and closed-loop
 (encoder-based) motion control with proper error handling and structured logging.
 
 Architecture:
-- All .NET method calls wrapped in asyncio.to_thread() for non-blocking execution
+- All .NET method calls run on one dedicated per-controller thread (non-blocking)
 - Callbacks for device state tracking (enabled, homed, moving, etc.)
 - Context manager support for safe connection cleanup
 - Structured logging via structlog for debugging and monitoring
 """
 
 import asyncio
+import functools
 import logging
+import operator
+import threading
 import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 from dataclasses import dataclass
 
 import structlog
@@ -31,8 +35,25 @@ except ImportError:
 # DLL path will be loaded from config/environment
 _kinesis_dll_path: Optional[str] = None
 _pdxc2_device_loaded = False
+_PDXC2_LOAD_LOCK = threading.Lock()
 
 logger = structlog.get_logger()
+
+# Default Kinesis device polling period; Status fields are at most this stale
+KINESIS_POLL_MS = 250
+
+_T = TypeVar("_T")
+
+# Re-reads device.Status on every call: Status is resolved through the device so
+# it reflects the latest poll, and no closure is built per check
+_pulse_params_acquired = operator.attrgetter("Status.IsPulseParamsAcquired")
+
+# Backoff bounds (seconds) for polling pulse-parameter acquisition in home()
+_PULSE_POLL_MIN_SEC = 0.02
+_PULSE_POLL_MAX_SEC = 0.25
+# Tick and bound (seconds) for waiting on device state during connect()
+_CONNECT_POLL_SEC = 0.02
+_CONNECT_STATE_TIMEOUT_SEC = 1.0
 task_context = contextvars.ContextVar("task_context", default="pdxc2")
 
 
@@ -49,38 +70,43 @@ def _load_pdxc2_dlls() -> None:
         raise RuntimeError("pythonnet not installed. Install with: pip install pythonnet==3.0.1")
     if _pdxc2_device_loaded:
         return  # Already loaded
+
+    # Serialize the first load: concurrent controllers must not both run clr.AddReference
+    with _PDXC2_LOAD_LOCK:
+        if _pdxc2_device_loaded:
+            return
     
-    if not _kinesis_dll_path:
-        # Fallback to common Kinesis installation path
-        dll_path = r"C:\Program Files\Thorlabs\Kinesis"
-        logger.info("kinesis_dll_path not set, using default", default_path=dll_path)
-    else:
-        dll_path = _kinesis_dll_path
+        if not _kinesis_dll_path:
+            # Fallback to common Kinesis installation path
+            dll_path = r"C:\Program Files\Thorlabs\Kinesis"
+            logger.info("kinesis_dll_path not set, using default", default_path=dll_path)
+        else:
+            dll_path = _kinesis_dll_path
     
-    try:
-        # Add references to Thorlabs Kinesis .NET assemblies
-        clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.Benchtop.PiezoCLI.dll")
-        clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.DeviceManagerCLI.dll")
-        clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.GenericPiezoCLI.dll")
-        
-        # Import .NET namespaces
-        from Thorlabs.MotionControl.DeviceManagerCLI import DeviceManagerCLI as DM_CLI
-        from Thorlabs.MotionControl.Benchtop.PiezoCLI.PDXC2 import InertiaStageController as ISC
-        # These enums may be in the parent Piezo namespace
-        from Thorlabs.MotionControl.GenericPiezoCLI.Piezo import PiezoControlModeTypes as PCMT
-        from Thorlabs.MotionControl.Benchtop.PiezoCLI.PDXC2 import OpenLoopMoveParams as OLMP
-        
-        # Store in module globals for use in class
-        globals()["DeviceManagerCLI"] = DM_CLI
-        globals()["InertiaStageController"] = ISC
-        globals()["PiezoControlModeTypes"] = PCMT
-        globals()["OpenLoopMoveParams"] = OLMP
-        
-        _pdxc2_device_loaded = True
-        logger.info("pdxc2_dlls_loaded", dll_path=dll_path)
-    except Exception as e:
-        logger.error("failed_to_load_pdxc2_dlls", error=str(e), dll_path=dll_path)
-        raise
+        try:
+            # Add references to Thorlabs Kinesis .NET assemblies
+            clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.Benchtop.PiezoCLI.dll")
+            clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.DeviceManagerCLI.dll")
+            clr.AddReference(f"{dll_path}\\Thorlabs.MotionControl.GenericPiezoCLI.dll")
+        
+            # Import .NET namespaces
+            from Thorlabs.MotionControl.DeviceManagerCLI import DeviceManagerCLI as DM_CLI
+            from Thorlabs.MotionControl.Benchtop.PiezoCLI.PDXC2 import InertiaStageController as ISC
+            # These enums may be in the parent Piezo namespace
+            from Thorlabs.MotionControl.GenericPiezoCLI.Piezo import PiezoControlModeTypes as PCMT
+            from Thorlabs.MotionControl.Benchtop.PiezoCLI.PDXC2 import OpenLoopMoveParams as OLMP
+        
+            # Store in module globals for use in class
+            globals()["DeviceManagerCLI"] = DM_CLI
+            globals()["InertiaStageController"] = ISC
+            globals()["PiezoControlModeTypes"] = PCMT
+            globals()["OpenLoopMoveParams"] = OLMP
+        
+            _pdxc2_device_loaded = True
+            logger.info("pdxc2_dlls_loaded", dll_path=dll_path)
+        except Exception as e:
+            logger.error("failed_to_load_pdxc2_dlls", error=str(e), dll_path=dll_path)
+            raise
 
 
 @dataclass
@@ -105,20 +131,24 @@ class PDXC2Controller:
     - Device lifecycle (connect, enable, home, disconnect)
     - Callbacks for state tracking
     
-    All blocking .NET calls are executed via asyncio.to_thread() to prevent
-    blocking the async event loop.
+    All blocking .NET calls are executed on a single dedicated thread per
+    controller, which keeps them off the event loop and serialized against
+    the (non-thread-safe) device.
     """
     
-    def __init__(self, serial_number: str = "112000001"):
+    def __init__(self, serial_number: str = "112000001", poll_interval_ms: int = KINESIS_POLL_MS):
         """
         Initialize PDXC2Controller.
         
         Args:
             serial_number: Device serial number (e.g. "112000001")
+            poll_interval_ms: Kinesis status polling period; shorter detects
+                state changes sooner at the cost of more device traffic
         """
         _load_pdxc2_dlls()
         
         self.serial_number = serial_number
+        self.poll_interval_ms = poll_interval_ms
         self.device: Optional[InertiaStageController] = None
         self._connected = False
         self._enabled = False
@@ -127,6 +157,20 @@ class PDXC2Controller:
         self._position_mode = "open_loop"
         self._is_moving = False
         self._last_error: Optional[str] = None
+        # Set while no move is in flight; cleared at MoveStart and set again by
+        # the device's MoveCompleted event (when _register_callbacks finds one)
+        self._move_done = asyncio.Event()
+        self._move_done.set()
+        self._move_events = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Bound .NET methods of the current device, refreshed when it is recreated
+        self._get_pos: Optional[Callable[[], int]] = None
+        self._move_start: Optional[Callable[[], None]] = None
+        self._move_stop: Optional[Callable[[], None]] = None
+        self._set_olp: Optional[Callable[[Any], None]] = None
+        self._set_clt: Optional[Callable[[int], None]] = None
+        # Reused OpenLoopMoveParams; only StepSize changes between moves
+        self._olp: Any = None
         
         logger.info(
             "pdxc2_controller_initialized",
@@ -134,6 +178,15 @@ class PDXC2Controller:
             task=task_context.get()
         )
     
+    async def _submit(self, fn: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking .NET call on this controller's I/O thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"pdxc2-{self.serial_number}"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+    
     async def connect(self) -> bool:
         """
         Connect to PDXC2 device and initialize polling.
@@ -143,42 +196,46 @@ class PDXC2Controller:
         """
         try:
             # Build device list so the library can find the device
-            await asyncio.to_thread(DeviceManagerCLI.BuildDeviceList)
-            await asyncio.sleep(0.1)
+            await self._submit(DeviceManagerCLI.BuildDeviceList)
+            if not await self._poll_until(self._device_listed):
+                logger.warning("pdxc2_device_not_listed", serial_number=self.serial_number)
             
             # Create device instance
-            self.device = await asyncio.to_thread(
+            self.device = await self._submit(
                 InertiaStageController.CreateInertiaStageController,
                 self.serial_number
             )
-            await asyncio.sleep(0.1)
+            self._move_events = False  # New device object; _register_callbacks re-subscribes
+            self._bind_device_methods()
             
             # Try to connect - may fail if already connected by Kinesis
             try:
-                await asyncio.to_thread(self.device.Connect, self.serial_number)
-                await asyncio.sleep(0.25)
+                await self._submit(self.device.Connect, self.serial_number)
             except Exception as e:
                 # Device might already be connected via Kinesis UI
                 logger.info("connect_already_connected_or_unavailable", error=str(e))
                 # Try to proceed anyway - device might still be accessible
             
-            # Start polling (250ms rate is standard)
+            # Start polling unless it is already running (e.g. device opened by the
+            # Kinesis UI); a redundant StartPolling throws a .NET exception
             try:
-                await asyncio.to_thread(self.device.StartPolling, 250)
-                await asyncio.sleep(0.25)
+                if not await self._submit(self._is_polling):
+                    await self._submit(self.device.StartPolling, self.poll_interval_ms)
             except Exception as e:
                 logger.warning("polling_may_already_started", error=str(e))
+            if not await self._poll_until(lambda: self.device.IsConnected):
+                logger.warning("pdxc2_not_reporting_connected", serial_number=self.serial_number)
             
             # Wait for settings to initialize
             try:
-                if not await asyncio.to_thread(self.device.IsSettingsInitialized):
-                    await asyncio.to_thread(self.device.WaitForSettingsInitialized, 10000)
+                if not await self._submit(self.device.IsSettingsInitialized):
+                    await self._submit(self.device.WaitForSettingsInitialized, 10000)
             except Exception as e:
                 logger.warning("settings_initialization_check_failed", error=str(e))
             
             # Try a simple query to verify device is accessible
             try:
-                pos = await asyncio.to_thread(self.device.GetCurrentPosition)
+                pos = await self._submit(self._get_pos)
                 logger.info("device_query_successful", position=pos)
             except Exception as e:
                 logger.error("device_query_failed", error=str(e))
@@ -200,6 +257,40 @@ class PDXC2Controller:
             )
             return False
     
+    def _is_polling(self) -> bool:
+        is_polling = getattr(self.device, "IsPolling", None)
+        return bool(is_polling() if callable(is_polling) else is_polling)
+    
+    def _device_listed(self) -> bool:
+        return bool(DeviceManagerCLI.GetDeviceList().Contains(self.serial_number))
+    
+    async def _poll_until(self, check: Callable[[], Any], timeout_sec: float = _CONNECT_STATE_TIMEOUT_SEC) -> bool:
+        """Poll a blocking state query on the device thread until it is truthy or times out.
+        
+        Replaces fixed settle delays: returns as soon as the state is reached.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_sec
+        while True:
+            try:
+                if await self._submit(check):
+                    return True
+            except Exception as e:
+                logger.debug("pdxc2_state_query_failed", error=str(e))
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(_CONNECT_POLL_SEC)
+    
+    def _bind_device_methods(self) -> None:
+        """Resolve hot-path .NET methods once per device object instead of per call."""
+        device = self.device
+        self._get_pos = device.GetCurrentPosition
+        self._move_start = device.MoveStart
+        self._move_stop = device.MoveStop
+        self._set_olp = device.SetOpenLoopMoveParameters
+        self._set_clt = device.SetClosedLoopTarget
+        self._olp = OpenLoopMoveParams()
+    
     async def disconnect(self) -> bool:
         """
         Disconnect from PDXC2 device.
@@ -209,11 +300,15 @@ class PDXC2Controller:
         """
         try:
             if self.device:
-                await asyncio.to_thread(self.device.StopPolling)
-                await asyncio.to_thread(self.device.Disconnect, True)
+                await self._submit(self.device.StopPolling)
+                await self._submit(self.device.Disconnect, True)
                 self._connected = False
                 self._enabled = False
                 logger.info("pdxc2_disconnected", serial_number=self.serial_number)
+            if self._executor is not None:
+                # Recreated by the next _submit if the controller reconnects
+                self._executor.shutdown(wait=False)
+                self._executor = None
             return True
         except Exception as e:
             self._last_error = str(e)
@@ -232,7 +327,7 @@ class PDXC2Controller:
             return False
         
         try:
-            await asyncio.to_thread(self.device.EnableDevice)
+            await self._submit(self.device.EnableDevice)
             await asyncio.sleep(0.25)
             self._enabled = True
             logger.info("pdxc2_device_enabled", serial_number=self.serial_number)
@@ -253,7 +348,7 @@ class PDXC2Controller:
             return False
         
         try:
-            await asyncio.to_thread(self.device.DisableDevice)
+            await self._submit(self.device.DisableDevice)
             self._enabled = False
             logger.info("pdxc2_device_disabled", serial_number=self.serial_number)
             return True
@@ -273,7 +368,7 @@ class PDXC2Controller:
             return False
         
         try:
-            await asyncio.to_thread(
+            await self._submit(
                 self.device.SetPositionControlMode,
                 PiezoControlModeTypes.OpenLoop
             )
@@ -297,7 +392,7 @@ class PDXC2Controller:
             return False
         
         try:
-            await asyncio.to_thread(
+            await self._submit(
                 self.device.SetPositionControlMode,
                 PiezoControlModeTypes.CloseLoop
             )
@@ -309,6 +404,19 @@ class PDXC2Controller:
             logger.error("pdxc2_set_closed_loop_mode_failed", error=str(e))
             return False
     
+    # Blocking set+start sequences, each run in a single executor hop
+    
+    def _open_loop_move_sync(self, step_size: int) -> None:
+        # Mutated here on the I/O thread so queued moves can't overwrite each other's step
+        params = self._olp
+        params.StepSize = step_size
+        self._set_olp(params)
+        self._move_start()
+    
+    def _closed_loop_move_sync(self, target_nm: int) -> None:
+        self._set_clt(target_nm)
+        self._move_start()
+    
     async def move_open_loop(self, step_size: int) -> bool:
         """
         Move stage in open-loop mode (steps).
@@ -329,13 +437,9 @@ class PDXC2Controller:
             # Clamp step size to valid range
             step_size = max(-10000000, min(10000000, step_size))
             
-            # Set open-loop parameters
-            params = OpenLoopMoveParams()
-            params.StepSize = step_size
-            await asyncio.to_thread(self.device.SetOpenLoopMoveParameters, params)
-            
-            # Initiate move
-            await asyncio.to_thread(self.device.MoveStart)
+            # Apply parameters and initiate move in one executor hop
+            self._move_done.clear()
+            await self._submit(self._open_loop_move_sync, step_size)
             self._is_moving = True
             
             logger.info(
@@ -374,11 +478,9 @@ class PDXC2Controller:
             # Clamp position to valid range
             target_nm = max(-1000000, min(1000000, target_nm))
             
-            # Set target position
-            await asyncio.to_thread(self.device.SetClosedLoopTarget, target_nm)
-            
-            # Initiate move
-            await asyncio.to_thread(self.device.MoveStart)
+            # Set target position and initiate move in one executor hop
+            self._move_done.clear()
+            await self._submit(self._closed_loop_move_sync, target_nm)
             self._is_moving = True
             
             logger.info(
@@ -410,21 +512,23 @@ class PDXC2Controller:
         
         try:
             # Start performance optimization (pulse parameter acquisition)
-            await asyncio.to_thread(self.device.PulseParamsAcquireStart)
-            await asyncio.sleep(0.5)
+            await self._submit(self.device.PulseParamsAcquireStart)
+            # Let one device poll land so a flag left over from a previous run isn't read
+            await asyncio.sleep(self.poll_interval_ms / 1000.0)
             
-            # Wait for optimization to complete
-            max_wait = timeout_ms / 1000.0
-            elapsed = 0.0
-            while elapsed < max_wait:
-                status = await asyncio.to_thread(lambda: self.device.Status.IsPulseParamsAcquired)
+            # Wait for optimization to complete, backing off from short to poll-rate checks
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout_ms / 1000.0
+            delay = _PULSE_POLL_MIN_SEC
+            while loop.time() < deadline:
+                status = await self._submit(_pulse_params_acquired, self.device)
                 if status:
                     break
-                await asyncio.sleep(0.5)
-                elapsed += 0.5
+                await asyncio.sleep(min(delay, max(0.0, deadline - loop.time())))
+                delay = min(_PULSE_POLL_MAX_SEC, delay * 1.5)
             
             # Home the device
-            await asyncio.to_thread(self.device.Home, timeout_ms)
+            await self._submit(self.device.Home, timeout_ms)
             
             self._homed = True
             logger.info("pdxc2_homed", serial_number=self.serial_number)
@@ -452,7 +556,7 @@ class PDXC2Controller:
         
         try:
             # Just home without pulse parameter acquisition
-            await asyncio.to_thread(self.device.Home, timeout_ms)
+            await self._submit(self.device.Home, timeout_ms)
             
             self._homed = True
             logger.info("pdxc2_quick_home", serial_number=self.serial_number)
@@ -489,14 +593,17 @@ class PDXC2Controller:
         if not self.device:
             return False
         
+        if self._move_events:
+            return await self._wait_move_event(timeout_ms)
+        
         try:
             max_wait = timeout_ms / 1000.0
             elapsed = 0.0
-            last_pos = await asyncio.to_thread(self.device.GetCurrentPosition)
+            last_pos = await self._submit(self._get_pos)
             
             while elapsed < max_wait:
                 await asyncio.sleep(0.5)
-                current_pos = await asyncio.to_thread(self.device.GetCurrentPosition)
+                current_pos = await self._submit(self._get_pos)
                 
                 if current_pos == last_pos:
                     # Position hasn't changed, move complete
@@ -520,6 +627,28 @@ class PDXC2Controller:
             logger.error("pdxc2_wait_move_complete_failed", error=str(e))
             return False
     
+    async def _wait_move_event(self, timeout_ms: int) -> bool:
+        """Await the MoveCompleted event, then read the final position once."""
+        try:
+            await asyncio.wait_for(self._move_done.wait(), timeout_ms / 1000.0)
+        except asyncio.TimeoutError:
+            logger.warning("pdxc2_move_timeout", timeout_ms=timeout_ms)
+            return False
+        try:
+            current_pos = await self._submit(self._get_pos)
+        except Exception as e:
+            self._last_error = str(e)
+            logger.error("pdxc2_wait_move_complete_failed", error=str(e))
+            return False
+        self._is_moving = False
+        self._current_position = current_pos
+        logger.info(
+            "pdxc2_move_complete",
+            position=current_pos,
+            position_mode=self._position_mode
+        )
+        return True
+    
     async def get_current_position(self) -> int:
         """
         Get current position.
@@ -531,7 +660,7 @@ class PDXC2Controller:
             return self._current_position
         
         try:
-            pos = await asyncio.to_thread(self.device.GetCurrentPosition)
+            pos = await self._submit(self._get_pos)
             self._current_position = pos
             return pos
         except Exception as e:
@@ -550,8 +679,9 @@ class PDXC2Controller:
             return False
         
         try:
-            await asyncio.to_thread(self.device.MoveStop)
+            await self._submit(self._move_stop)
             self._is_moving = False
+            self._move_done.set()  # Release waiters even if no MoveCompleted follows a stop
             logger.info("pdxc2_move_stopped")
             return True
         except Exception as e:
@@ -582,10 +712,21 @@ class PDXC2Controller:
             return
         
         try:
-            # Note: These callbacks come from the .NET layer
-            # We can subscribe to device events if the .NET API supports them
-            # For now, we track state through direct polling/method calls
-            logger.info("pdxc2_callbacks_registered", serial_number=self.serial_number)
+            # .NET events fire on a Kinesis thread; hop back onto the loop to set
+            # the asyncio.Event. Without the event, wait_move_complete polls.
+            if not self._move_events and getattr(self.device, "MoveCompleted", None) is not None:
+                loop = asyncio.get_running_loop()
+
+                def _on_move_completed(*_args) -> None:
+                    loop.call_soon_threadsafe(self._move_done.set)
+
+                self.device.MoveCompleted += _on_move_completed
+                self._move_events = True
+            logger.info(
+                "pdxc2_callbacks_registered",
+                serial_number=self.serial_number,
+                move_events=self._move_events,
+            )
         except Exception as e:
             logger.warning("pdxc2_callback_registration_failed", error=str(e))
     
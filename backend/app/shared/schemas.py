@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 
-from pydantic import BaseModel, Field
+import msgspec
 
 
 class WorkerPayloadType(str, Enum):
@@ -13,15 +13,39 @@ class WorkerPayloadType(str, Enum):
     heartbeat = "heartbeat"
 
 
-class WorkerPayload(BaseModel):
+class WorkerPayload(msgspec.Struct, array_like=True, gc=False):
+    """One message from a worker process.
+
+    Encoded positionally (array_like), so field order is the wire format:
+    append new fields at the end, with defaults. Not tracked by the cyclic GC
+    (gc=False): payloads are created at frame/sample rate and never form
+    reference cycles, so ``metadata`` must not point back at its payload.
+    """
+
     worker: str
-    sequence_id: int = Field(default=0)
-    monotonic_ts: float = Field(description="Monotonic timestamp from the worker process")
+    monotonic_ts: float  # Monotonic timestamp from the worker process
     payload_type: WorkerPayloadType
-    data: bytes = Field(description="Binary payload specific to the worker")
+    data: bytes  # Binary payload specific to the worker
+    sequence_id: int = 0
     metadata: Optional[dict] = None
+    # (slot, length) in the worker's FrameRing when ``data`` was sent out of band
+    data_ref: Optional[Tuple[int, int]] = None
+
 
+# Payloads cross the worker data queue as msgpack bytes rather than pickled objects
+_payload_encoder = msgspec.msgpack.Encoder()
+_payload_decoder = msgspec.msgpack.Decoder(WorkerPayload)
+encode_payload = _payload_encoder.encode
+decode_payload = _payload_decoder.decode
 
-class ControlMessage(BaseModel):
+
+class ControlMessage(msgspec.Struct):
     command: str
-    args: dict = Field(default_factory=dict)
+    args: dict = msgspec.field(default_factory=dict)
+
+
+# Control messages cross the pipe as msgpack bytes (Connection.send_bytes/recv_bytes)
+_control_encoder = msgspec.msgpack.Encoder()
+_control_decoder = msgspec.msgpack.Decoder(ControlMessage)
+encode_control = _control_encoder.encode
+decode_control = _control_decoder.decode
@@ -1,73 +1,240 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import multiprocessing as mp
-from dataclasses import dataclass
-from typing import AsyncIterator, Optional
-
-from ..shared.schemas import ControlMessage, WorkerPayload
+import queue
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..shared.schemas import ControlMessage, WorkerPayload, decode_control, decode_payload, encode_control, encode_payload
+
+
+class FrameRing:
+    """Fixed-slot shared-memory buffer for large worker payloads (camera frames).
+
+    The worker copies a frame into the current slot and enqueues a small
+    ``WorkerPayload`` whose ``data_ref`` names ``(slot, length)``; the manager
+    copies the bytes out as it dequeues that token. The worker only moves to
+    the next slot once a token has been enqueued, and the ring has two more
+    slots than the data queue can hold tokens, so a slot is never rewritten
+    while a token still names it.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, slot_size: int, *, owner: bool) -> None:
+        self._shm = shm
+        self._buf: Optional[memoryview] = shm.buf
+        self.slots = slots
+        self.slot_size = slot_size
+        self._owner = owner
+        self._next = 0
 
+    @classmethod
+    def create(cls, slots: int, slot_size: int) -> "FrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        return cls(shm, slots, slot_size, owner=True)
 
-@dataclass
+    @classmethod
+    def attach(cls, descriptor: Dict[str, Any]) -> "FrameRing":
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        return cls(shm, descriptor["slots"], descriptor["slot_size"], owner=False)
+
+    def descriptor(self) -> Dict[str, Any]:
+        """Picklable description handed to the worker through its config."""
+        return {"name": self._shm.name, "slots": self.slots, "slot_size": self.slot_size}
+
+    def write(self, data: Any) -> Optional[Tuple[int, int]]:
+        """Copy a bytes-like object into the current slot; None if it doesn't fit."""
+        view = memoryview(data).cast("B")
+        length = view.nbytes
+        if length > self.slot_size:
+            return None
+        start = self._next * self.slot_size
+        self._buf[start : start + length] = view
+        return self._next, length
+
+    def advance(self) -> None:
+        """Move to the next slot; call only after the token for the current one was enqueued."""
+        self._next = (self._next + 1) % self.slots
+
+    def read(self, slot: int, length: int) -> bytes:
+        start = slot * self.slot_size
+        return bytes(self._buf[start : start + length])
+
+    def close(self) -> None:
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+@dataclass(slots=True)
 class WorkerChannels:
     """Control/data IPC primitives shared between main process and worker."""
 
     control_parent: mp.connection.Connection
     control_child: mp.connection.Connection
     data_queue: mp.Queue
+    frame_ring: Optional[FrameRing] = None
 
     @classmethod
-    def create(cls, *, queue_size: int = 64) -> "WorkerChannels":
-        parent_conn, child_conn = mp.Pipe()
-        data_queue: mp.Queue = mp.Queue(maxsize=queue_size)
-        return cls(control_parent=parent_conn, control_child=child_conn, data_queue=data_queue)
+    def create(
+        cls,
+        *,
+        queue_size: int = 64,
+        frame_slot_bytes: int = 0,
+        ctx: Optional[mp.context.BaseContext] = None,
+    ) -> "WorkerChannels":
+        # Queue locks must come from the same start-method context as the worker
+        # Process (spawn), not the platform default (fork on Linux)
+        ctx = ctx or mp.get_context()
+        parent_conn, child_conn = ctx.Pipe()
+        data_queue: mp.Queue = ctx.Queue(maxsize=queue_size)
+        # queue_size queued tokens + one being copied out + one being written
+        frame_ring = FrameRing.create(queue_size + 2, frame_slot_bytes) if frame_slot_bytes > 0 else None
+        return cls(control_parent=parent_conn, control_child=child_conn, data_queue=data_queue, frame_ring=frame_ring)
+
+    def close(self) -> None:
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
 
 
 class ControlChannel:
     def __init__(self, connection: mp.connection.Connection) -> None:
         self._conn = connection
+        # Filled by an event-loop reader on the pipe fd where the loop supports
+        # it (selector loops on POSIX); otherwise recv() falls back to a thread
+        self._inbox: Optional[asyncio.Queue] = None
+        self._reader_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader_checked = False
+
+    def _start_reader(self) -> None:
+        self._reader_checked = True
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_reader(self._conn.fileno(), self._drain)
+        except (NotImplementedError, OSError, ValueError):
+            return  # e.g. Windows proactor loop / named-pipe handles
+        self._inbox = asyncio.Queue()
+        self._reader_loop = loop
+
+    def _drain(self) -> None:
+        try:
+            while self._conn.poll():
+                self._inbox.put_nowait(decode_control(self._conn.recv_bytes()))
+        except (EOFError, OSError) as exc:
+            self.close()
+            self._inbox.put_nowait(exc)
+
+    def close(self) -> None:
+        """Detach the event-loop reader, if one was registered."""
+        if self._reader_loop is not None:
+            self._reader_loop.remove_reader(self._conn.fileno())
+            self._reader_loop = None
 
     async def recv(self) -> ControlMessage:
-        return await asyncio.to_thread(self._conn.recv)
+        if not self._reader_checked:
+            self._start_reader()
+        if self._inbox is None:
+            return decode_control(await asyncio.to_thread(self._conn.recv_bytes))
+        message = await self._inbox.get()
+        if isinstance(message, BaseException):
+            raise message
+        return message
 
     async def iter_messages(self) -> AsyncIterator[ControlMessage]:
         while True:
             yield await self.recv()
 
     async def send(self, message: ControlMessage) -> None:
-        await asyncio.to_thread(self._conn.send, message.dict())
+        await asyncio.to_thread(self._conn.send_bytes, encode_control(message))
 
 
 class DataChannel:
-    def __init__(self, queue: mp.Queue) -> None:
+    """Parent side of a worker's data queue.
+
+    A queue item is one encoded payload, or a list of encoded payloads that
+    a worker sent together in a single put (e.g. a frame plus its heartbeat).
+    A list carries at most one FrameRing token, so the ring's sizing holds.
+    """
+
+    def __init__(self, queue: mp.Queue, frame_ring: Optional[FrameRing] = None) -> None:
         self._queue = queue
+        self._frame_ring = frame_ring
+        # Decoded payloads left over from a list item taken by get()
+        self._pending: Deque[WorkerPayload] = deque()
 
     async def publish(self, payload: WorkerPayload) -> None:
-        await asyncio.to_thread(self._queue.put, payload)
+        raw = encode_payload(payload)
+        # mp.Queue.put only blocks when full (the pipe write is done by its feeder
+        # thread), so only pay for the thread hop under backpressure
+        try:
+            self._queue.put_nowait(raw)
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, raw)
 
     async def get(self) -> WorkerPayload:
-        raw: WorkerPayload = await asyncio.to_thread(self._queue.get)
-        return raw
+        if not self._pending:
+            self._pending.extend(self._decode_item(await asyncio.to_thread(self._queue.get)))
+        return self._pending.popleft()
+
+    async def get_batch(self, max_items: int = 64) -> List[WorkerPayload]:
+        """Block for one queue item, then drain whatever else is already queued.
+
+        One thread hop and loop wakeup per burst instead of per payload.
+        """
+        if self._pending:
+            batch = list(self._pending)
+            self._pending.clear()
+        else:
+            batch = self._decode_item(await asyncio.to_thread(self._queue.get))
+        get_nowait = self._queue.get_nowait
+        while len(batch) < max_items:
+            try:
+                raw = get_nowait()
+            except queue.Empty:
+                break
+            batch.extend(self._decode_item(raw))
+        return batch
+
+    def _decode_item(self, item: Union[bytes, List[bytes]]) -> List[WorkerPayload]:
+        if isinstance(item, list):
+            return [self._decode(raw) for raw in item]
+        return [self._decode(item)]
+
+    def _decode(self, raw: bytes) -> WorkerPayload:
+        payload = decode_payload(raw)
+        if payload.data_ref is not None and self._frame_ring is not None:
+            # Copy out now: the worker may reuse the slot once this token is consumed
+            payload.data = self._frame_ring.read(*payload.data_ref)
+            payload.data_ref = None
+        return payload
 
     async def iter_payloads(self) -> AsyncIterator[WorkerPayload]:
         while True:
             yield await self.get()
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkerContext:
     name: str
     control: ControlChannel
     data: DataChannel
     heartbeat_interval_ms: int = 100
-    _sequence_id: int = 0
+    _sequence_ids: Iterator[int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._sequence_ids = itertools.count(1)
 
     async def send_payload(self, payload_type: str, data: bytes, metadata: Optional[dict] = None) -> None:
-        self._sequence_id += 1
         payload = WorkerPayload(
             worker=self.name,
-            sequence_id=self._sequence_id,
-            monotonic_ts=asyncio.get_running_loop().time(),
+            sequence_id=next(self._sequence_ids),
+            monotonic_ts=time.monotonic(),
             payload_type=payload_type,
             data=data,
             metadata=metadata,
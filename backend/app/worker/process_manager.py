@@ -3,34 +3,58 @@ from __future__ import annotations
 import asyncio
 import importlib
 import multiprocessing as mp
+import os
+import sys
 import time
-from dataclasses import dataclass
-from typing import Awaitable, Callable, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
 import structlog
 
 from ..core import metrics
-from ..shared.schemas import WorkerPayload, WorkerPayloadType
+from ..shared.schemas import ControlMessage, WorkerPayload, WorkerPayloadType, encode_control
 from .ipc import ControlChannel, DataChannel, WorkerChannels
 
 logger = structlog.get_logger(__name__)
 
+# Upper bound on payloads drained from a worker's data queue per wakeup
+MONITOR_BATCH_MAX = 64
 
-@dataclass
+# backend/ (parent of the 'app' package); resolved once at import, and again
+# in each spawned child as it imports this module to unpickle the bootstrap
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass(slots=True)
 class WorkerSpec:
     name: str
     target: str  # dotted path module:function
     config: dict
     queue_size: int = 64
+    # >0 sends payload data through a shared-memory FrameRing of slots this size
+    frame_slot_bytes: int = 0
+    # Pin the worker to these logical CPUs (None = OS default)
+    cpu_affinity: Optional[List[int]] = None
+    # (module_path, func_name) split from target once, so a bad path fails here
+    target_parts: Tuple[str, str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        module_path, sep, func_name = self.target.partition(":")
+        if not sep or not module_path or not func_name:
+            raise ValueError(f"Worker target must be 'module:function', got {self.target!r}")
+        self.target_parts = (module_path, func_name)
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkerProcess:
     spec: WorkerSpec
     process: mp.Process
     channels: WorkerChannels
+    # The one ControlChannel on channels.control_parent; each instance registers
+    # its own fd reader, so every caller shares this object
+    control: ControlChannel
     monitor_task: asyncio.Task[None]
-    last_heartbeat: float = 0.0
+    last_heartbeat_ns: int = 0  # time.monotonic_ns(); immune to wall-clock steps
 
 
 class WorkerProcessManager:
@@ -48,16 +72,27 @@ class WorkerProcessManager:
     async def start_worker(self, spec: WorkerSpec) -> None:
         if spec.name in self._workers:
             raise ValueError(f"Worker {spec.name} already running")
-        channels = WorkerChannels.create(queue_size=spec.queue_size)
+        channels = WorkerChannels.create(queue_size=spec.queue_size, frame_slot_bytes=spec.frame_slot_bytes, ctx=self._ctx)
+        config = spec.config
+        if channels.frame_ring is not None:
+            config = {**config, "frame_ring": channels.frame_ring.descriptor()}
         process = self._ctx.Process(
             target=_worker_bootstrap,
-            args=(spec.target, channels.control_child, channels.data_queue, spec.config),
+            args=(spec.target_parts, channels.control_child, channels.data_queue, config, spec.cpu_affinity),
             name=f"worker-{spec.name}",
             daemon=True,
         )
         process.start()
-        monitor_task = asyncio.create_task(self._monitor_worker(spec.name, channels))
-        worker = WorkerProcess(spec=spec, process=process, channels=channels, monitor_task=monitor_task, last_heartbeat=time.time())
+        data_channel = DataChannel(channels.data_queue, channels.frame_ring)
+        monitor_task = asyncio.create_task(self._monitor_worker(spec.name, data_channel))
+        worker = WorkerProcess(
+            spec=spec,
+            process=process,
+            channels=channels,
+            control=ControlChannel(channels.control_parent),
+            monitor_task=monitor_task,
+            last_heartbeat_ns=time.monotonic_ns(),
+        )
         self._workers[spec.name] = worker
         logger.info("worker_started", worker=spec.name, pid=process.pid)
 
@@ -70,10 +105,12 @@ class WorkerProcessManager:
             await worker.monitor_task
         except asyncio.CancelledError:
             pass
-        worker.channels.control_parent.send({"command": "shutdown"})
+        worker.control.close()
+        worker.channels.control_parent.send_bytes(encode_control(ControlMessage(command="shutdown")))
         worker.process.join(timeout=2)
         if worker.process.is_alive():
             worker.process.terminate()
+        worker.channels.close()
         del self._workers[name]
         logger.info("worker_stopped", worker=name)
 
@@ -81,38 +118,58 @@ class WorkerProcessManager:
         for name in list(self._workers.keys()):
             await self.stop_worker(name)
 
-    async def _monitor_worker(self, name: str, channels: WorkerChannels) -> None:
-        data_channel = DataChannel(channels.data_queue)
+    async def _monitor_worker(self, name: str, data_channel: DataChannel) -> None:
         while True:
-            payload = await data_channel.get()
-            if payload.payload_type == WorkerPayloadType.heartbeat:
-                ts = time.time()
-                metrics.worker_heartbeat_gauge(name).set(ts)
-                worker = self._workers.get(name)
-                if worker:
-                    worker.last_heartbeat = ts
-            await self._payload_handler(payload)
+            # Handled in arrival order; the handler only republishes, so awaiting
+            # each in turn is cheaper than gathering them as tasks
+            for payload in await data_channel.get_batch(MONITOR_BATCH_MAX):
+                if payload.payload_type == WorkerPayloadType.heartbeat:
+                    # The exported gauge stays a Unix timestamp for dashboards/alerts
+                    metrics.worker_heartbeat_gauge(name).set_to_current_time()
+                    worker = self._workers.get(name)
+                    if worker:
+                        worker.last_heartbeat_ns = time.monotonic_ns()
+                await self._payload_handler(payload)
 
     def get_control_channel(self, name: str) -> Optional[ControlChannel]:
         worker = self._workers.get(name)
         if not worker:
             return None
-        return ControlChannel(worker.channels.control_parent)
+        return worker.control
+
+    def snapshot(self) -> Dict[str, int]:
+        """Last heartbeat per worker, in time.monotonic_ns() units."""
+        return {name: worker.last_heartbeat_ns for name, worker in self._workers.items()}
+
+
+def _worker_bootstrap(
+    target_parts: Tuple[str, str],
+    control_conn,
+    data_queue,
+    config: dict,
+    cpu_affinity: Optional[List[int]] = None,
+) -> None:
+    # Make sure the worker module's own 'app.*' imports resolve in the child
+    if _BACKEND_DIR not in sys.path:
+        sys.path.insert(0, _BACKEND_DIR)
+    
+    # Pin before importing the target so its heavy imports already run on the chosen cores
+    if cpu_affinity:
+        _apply_cpu_affinity(cpu_affinity)
+    target = _resolve_target(*target_parts)
+    target(control_conn, data_queue, config)
 
-    def snapshot(self) -> Dict[str, float]:
-        return {name: worker.last_heartbeat for name, worker in self._workers.items()}
 
+def _apply_cpu_affinity(cpus: List[int]) -> None:
+    # psutil covers both sched_setaffinity (Linux) and SetProcessAffinityMask (Windows)
+    import psutil
 
-def _worker_bootstrap(target_path: str, control_conn, data_queue, config: dict) -> None:
-    import sys
-    import os
-    
-    # Add parent directory to path so subprocess can find 'app' module
-    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if backend_dir not in sys.path:
-        sys.path.insert(0, backend_dir)
-    
-    module_path, func_name = target_path.split(":")
+    try:
+        psutil.Process().cpu_affinity(list(cpus))
+    except (ValueError, psutil.Error, OSError) as exc:
+        logger.warning("worker_affinity_failed", cpus=cpus, error=str(exc))
+
+
+def _resolve_target(module_path: str, func_name: str) -> Callable:
     module = importlib.import_module(module_path)
-    target = getattr(module, func_name)
-    target(control_conn, data_queue, config)
+    return getattr(module, func_name)
@@ -24,7 +24,7 @@ import struct
 import time
 from typing import Any, Dict
 
-from app.shared.schemas import WorkerPayload, WorkerPayloadType
+from app.shared.schemas import WorkerPayload, WorkerPayloadType, decode_control, encode_payload
 
 
 def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
@@ -69,8 +69,8 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
     while running:
         # Check control messages
         if control_conn.poll():
-            message = control_conn.recv()
-            command = message.get("command")
+            message = decode_control(control_conn.recv_bytes())
+            command = message.command
             if command == "shutdown":
                 running = False
                 continue
@@ -113,7 +113,7 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
                 metadata=ft_data,
             )
             try:
-                data_queue.put(payload, block=False)
+                data_queue.put(encode_payload(payload), block=False)
             except Exception:
                 pass  # queue full, skip
 
@@ -130,7 +130,7 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
                 metadata={"samples": sample_count, "has_data": sample_count > 0},
             )
             try:
-                data_queue.put(heartbeat, block=False)
+                data_queue.put(encode_payload(heartbeat), block=False)
             except Exception:
                 pass
             last_heartbeat = now
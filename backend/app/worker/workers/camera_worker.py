@@ -1,13 +1,126 @@
 from __future__ import annotations
 
+import functools
+import queue
 import time
-from typing import Any, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import cv2
 import numpy as np
 from pypylon import pylon
 
-from app.shared.schemas import WorkerPayload, WorkerPayloadType
+from app.shared.schemas import WorkerPayload, WorkerPayloadType, decode_control, encode_payload
+from app.worker.ipc import FrameRing
+
+# Optional libjpeg-turbo SIMD encoder; cv2.imencode is used when it's missing
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+DEFAULT_JPEG_QUALITY = 80
+# Frames wider than this are downscaled before encoding
+STREAM_MAX_WIDTH = 800
+
+# Fallback checkerboard (40 px squares, 100 on even squares, 50 on odd), built once
+_TEST_SQUARE_PX = 40
+_square_rows = np.arange(480)[:, None] // _TEST_SQUARE_PX
+_square_cols = np.arange(640)[None, :] // _TEST_SQUARE_PX
+_even_square = (_square_rows + _square_cols) % 2 == 0
+_TEST_PATTERN = np.repeat(np.where(_even_square, 100, 50).astype(np.uint8)[:, :, None], 3, axis=2)
+
+
+def _encode_jpeg(frame: np.ndarray, quality: int) -> Optional[Any]:
+    """Encode a BGR or 2-D grayscale frame as JPEG; bytes-like, or None on failure."""
+    if simplejpeg is not None:
+        gray = frame.ndim == 2
+        return simplejpeg.encode_jpeg(
+            np.ascontiguousarray(frame[:, :, None] if gray else frame),
+            quality=quality,
+            colorspace="GRAY" if gray else "BGR",
+            fastdct=True,
+        )
+    success, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return encoded if success else None
+
+
+@functools.lru_cache(maxsize=8)
+def _stream_size(width: int, height: int) -> Optional[Tuple[int, int]]:
+    """(width, height) to stream a width x height source at, or None if it already fits."""
+    if width <= STREAM_MAX_WIDTH:
+        return None
+    scale = STREAM_MAX_WIDTH / width
+    return int(width * scale), int(height * scale)
+
+
+def _fit_stream_width(frame: np.ndarray) -> np.ndarray:
+    """Resize large frames to reasonable size for streaming (max STREAM_MAX_WIDTH)."""
+    new_size = _stream_size(frame.shape[1], frame.shape[0])
+    if new_size is None:
+        return frame
+    # INTER_AREA: proper box-filter decimation for downscaling, no aliasing at >=2x
+    return cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+
+# GenICam Bayer formats -> OpenCV demosaic codes. OpenCV names a pattern by its
+# second row, so the names are shifted (GenICam BayerRG is OpenCV BayerBG).
+_GENICAM_TO_CV2_BAYER = {
+    "BayerRG8": cv2.COLOR_BayerBG2BGR,
+    "BayerBG8": cv2.COLOR_BayerRG2BGR,
+    "BayerGR8": cv2.COLOR_BayerGB2BGR,
+    "BayerGB8": cv2.COLOR_BayerGR2BGR,
+}
+
+
+def _make_gpu_debayer(name: str, sensor_format: str) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """CUDA demosaic + downscale for raw Bayer grabs, or None to keep the CPU converter."""
+    code = _GENICAM_TO_CV2_BAYER.get(sensor_format)
+    if code is None:
+        print(f"[CameraWorker:{name}] use_gpu needs an 8-bit Bayer PixelFormat, got {sensor_format}")
+        return None
+    try:
+        if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+            raise RuntimeError("no CUDA device")
+        stream = cv2.cuda.Stream()
+        gpu_raw = cv2.cuda_GpuMat()
+    except (AttributeError, cv2.error, RuntimeError) as e:
+        print(f"[CameraWorker:{name}] CUDA unavailable, using CPU conversion: {e}")
+        return None
+
+    def debayer(raw: np.ndarray) -> np.ndarray:
+        # Upload, demosaic and resize are queued on one stream; download waits for them
+        gpu_raw.upload(raw, stream)
+        bgr = cv2.cuda.cvtColor(gpu_raw, code, stream=stream)
+        new_size = _stream_size(raw.shape[1], raw.shape[0])
+        if new_size is not None:
+            bgr = cv2.cuda.resize(bgr, new_size, interpolation=cv2.INTER_AREA, stream=stream)
+        frame = bgr.download(stream)
+        stream.waitForCompletion()
+        return frame
+
+    return debayer
+
+
+def _make_jpeg_encoder(name: str, kind: str) -> Callable[[np.ndarray, int], Optional[Any]]:
+    """Pick the frame encoder for config["encoder"]: "cpu" (default) or "nvjpeg"."""
+    if kind != "nvjpeg":
+        return _encode_jpeg
+    try:
+        # Optional GPU encoder (pynvjpeg); needs a CUDA device
+        from nvjpeg import NvJpeg
+
+        gpu = NvJpeg()
+    except Exception as e:
+        print(f"[CameraWorker:{name}] nvjpeg unavailable, using CPU JPEG: {e}")
+        return _encode_jpeg
+
+    def encode(frame: np.ndarray, quality: int) -> Optional[Any]:
+        if frame.ndim == 2:
+            return _encode_jpeg(frame, quality)  # nvjpeg path is BGR-only here
+        return gpu.encode(np.ascontiguousarray(frame), quality)
+
+    return encode
 
 
 def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
@@ -16,9 +129,73 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
     name = config.get("name", "basler_camera")
     fps = float(config.get("fps", 30))
     interval = 1.0 / fps
-    last_heartbeat = time.time()
+    jpeg_quality = int(config.get("jpeg_quality", DEFAULT_JPEG_QUALITY))
+    encode_jpeg = _make_jpeg_encoder(name, config.get("encoder", "cpu"))
+    # Optional output rate below fps: frames in between are retrieved and
+    # released without being converted, resized or encoded
+    target_stream_fps = config.get("target_stream_fps")
+    emit_interval = 1.0 / float(target_stream_fps) if target_stream_fps else 0.0
+    next_emit_ts = time.monotonic()
+    next_tick = next_emit_ts
+    # Fallback frames are redrawn into this buffer instead of a new array per frame
+    fallback_frame = np.empty_like(_TEST_PATTERN)
+    last_heartbeat = next_emit_ts
+    # Payloads dropped on a full data queue and failed grabs, reported at most once per second
+    dropped = 0
+    grab_failures = 0
+    last_grab_error = None
+    last_drop_report = last_heartbeat
     running = True
     frame_count = 0
+    # Frame bytes go through shared memory when the manager provided a ring
+    ring_descriptor = config.get("frame_ring")
+    frame_ring = FrameRing.attach(ring_descriptor) if ring_descriptor else None
+    # Resize/encode/enqueue run on one background thread so they overlap the next
+    # grab. At most one frame is in flight, which keeps FrameRing writes and queue
+    # order single-threaded; cv2 itself is kept to one thread to avoid oversubscription.
+    cv2.setNumThreads(1)
+    encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-encode")
+    encode_job: Optional[Future] = None
+    frame_drops = 0  # incremented only by the encoder thread
+    reported_frame_drops = 0
+
+    def encode_and_enqueue(frame: np.ndarray, heartbeat_raw: Optional[bytes]) -> None:
+        nonlocal frame_count, frame_drops
+        frame = _fit_stream_width(frame)
+        frame_height, frame_width = frame.shape[:2]
+        # Grayscale is encoded as 1-channel JPEG; browsers decode it directly
+        channels = 1 if frame.ndim == 2 else 3
+        frame_bytes = encode_jpeg(frame, jpeg_quality)
+        data_ref = None
+        item: Any = heartbeat_raw
+        if frame_bytes is not None:
+            data_ref = frame_ring.write(frame_bytes) if frame_ring is not None else None
+            payload = WorkerPayload(
+                worker=name,
+                sequence_id=frame_count,
+                monotonic_ts=time.monotonic(),
+                payload_type=WorkerPayloadType.frame,
+                data=b"" if data_ref is not None else bytes(frame_bytes),
+                metadata={"format": "jpeg", "width": frame_width, "height": frame_height, "channels": channels},
+                data_ref=data_ref,
+            )
+            frame_raw = encode_payload(payload)
+            # A frame and a due heartbeat go out as one queue item (one lock, one pipe write)
+            item = [frame_raw, heartbeat_raw] if heartbeat_raw is not None else frame_raw
+        if item is None:
+            return
+        try:
+            data_queue.put(item, block=False)
+        except queue.Full:
+            # Skip the item; retrying just its heartbeat would hit the same full
+            # queue, and a lost heartbeat is replaced by the next one in 100 ms
+            if frame_bytes is not None:
+                frame_drops += 1  # its ring slot is simply reused
+            return
+        if frame_bytes is not None:
+            frame_count += 1
+            if data_ref is not None:
+                frame_ring.advance()
     
     print(f"[CameraWorker] Starting {name}, FPS={fps:.1f}")
     print(f"[CameraWorker] Data queue: {data_queue}")
@@ -29,6 +206,15 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
     converter = None
     use_fallback = True
     target_serial = config.get("serial", None)  # assigned from main.py config
+    # On-sensor binning factor (1 = off); cuts pixels before any host-side work
+    binning = int(config.get("binning", 1))
+    # Optional sensor PixelFormat, e.g. "Mono8"; None keeps the camera's setting
+    pixel_format = config.get("pixel_format")
+    # True when grabs are already Mono8 and can skip the ImageFormatConverter
+    mono8_passthrough = False
+    # Demosaic raw Bayer grabs on the GPU instead of the converter (CPU fallback)
+    use_gpu = bool(config.get("use_gpu", False))
+    gpu_debayer = None
     MAX_RETRIES = 3
 
     for attempt in range(1, MAX_RETRIES + 1):
@@ -59,9 +245,28 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
 
             camera = pylon.InstantCamera(tlFactory.CreateDevice(device_to_use))
             camera.Open()
+            if binning > 1:
+                try:
+                    camera.BinningHorizontal.SetValue(binning)
+                    camera.BinningVertical.SetValue(binning)
+                except Exception as e:
+                    print(f"[CameraWorker:{name}] Binning x{binning} not applied: {e}")
+            if pixel_format:
+                try:
+                    camera.PixelFormat.SetValue(pixel_format)
+                except Exception as e:
+                    print(f"[CameraWorker:{name}] PixelFormat {pixel_format} not applied: {e}")
             camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
             converter = pylon.ImageFormatConverter()
-            converter.OutputPixelFormat = pylon.PixelType_BGR8packed
+            sensor_format = str(camera.PixelFormat.GetValue())
+            mono8_passthrough = sensor_format == "Mono8"
+            if use_gpu:
+                gpu_debayer = _make_gpu_debayer(name, sensor_format)
+            # Mono sensors stay single-channel until after the resize
+            if sensor_format.startswith("Mono"):
+                converter.OutputPixelFormat = pylon.PixelType_Mono8
+            else:
+                converter.OutputPixelFormat = pylon.PixelType_BGR8packed
             use_fallback = False
             print(f"[CameraWorker:{name}] Camera SN {target_serial} opened and grabbing")
             break
@@ -78,16 +283,24 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
 
     while running:
         if control_conn.poll():
-            message = control_conn.recv()
-            command = message.get("command")
+            message = decode_control(control_conn.recv_bytes())
+            command = message.command
             if command == "shutdown":
                 running = False
             elif command == "set_fps":
-                fps = max(float(message.get("value", 30)), 1.0)
+                fps = max(float(message.args.get("value", 30)), 1.0)
                 interval = 1.0 / fps
 
         frame = None
-        frame_bytes = None
+        # One clock read per iteration drives emit, heartbeat and report timing
+        now_mono = time.monotonic()
+        if encode_job is not None and encode_job.done():
+            error = encode_job.exception()
+            if error is not None:
+                print(f"[CameraWorker:{name}] Encode failed: {type(error).__name__}: {error}")
+            encode_job = None
+        # Skip conversion too while the previous frame is still being encoded
+        emit = encode_job is None and now_mono >= next_emit_ts
         
         # Try to grab from camera
         if camera and not use_fallback and camera.IsGrabbing() and converter:
@@ -95,14 +308,28 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
                 # Use longer timeout to wait for frames properly
                 grab_result = camera.RetrieveResult(500, pylon.TimeoutHandling_ThrowException)
                 
-                if grab_result.GrabSucceeded():
-                    # Convert to BGR
-                    converter.OutputPixelFormat = pylon.PixelType_BGR8packed
+                if not grab_result.GrabSucceeded():
+                    grab_failures += 1
+                    last_grab_error = grab_result.GetErrorCode()
+                elif emit and mono8_passthrough:
+                    # Already 8-bit gray: GetArray() copies the buffer out, no converter pass
+                    frame = grab_result.GetArray()
+                elif emit and gpu_debayer is not None:
+                    # Returns a new, already stream-sized BGR array per frame
+                    try:
+                        frame = gpu_debayer(grab_result.GetArray())
+                    except cv2.error as e:
+                        # Keep the camera and convert this grab on the CPU, or the
+                        # test pattern below would go out in place of a real frame
+                        print(f"[CameraWorker:{name}] GPU demosaic failed, switching to CPU: {e}")
+                        gpu_debayer = None
+                        frame = converter.Convert(grab_result).GetArray()
+                elif emit:
+                    # Convert to BGR (Mono8 for mono sensors; see init)
                     image = converter.Convert(grab_result)
-                    frame = image.GetArray().copy()
-                else:
-                    error_code = grab_result.GetErrorCode()
-                    print(f"[CameraWorker] Grab failed with error code: {error_code}")
+                    # Convert() returns a fresh image, so its array needs no defensive copy;
+                    # everything downstream only reads it before the next Convert()
+                    frame = image.GetArray()
                 
                 grab_result.Release()
                 
@@ -123,15 +350,9 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
                     camera = None
 
         # Fall back to test pattern if no real frame
-        if frame is None or use_fallback:
-            frame = np.ones((480, 640, 3), dtype=np.uint8) * 50
-            
-            # Draw checkerboard pattern
-            square_size = 40
-            for y in range(0, 480, square_size):
-                for x in range(0, 640, square_size):
-                    if ((x // square_size) + (y // square_size)) % 2 == 0:
-                        frame[y : y + square_size, x : x + square_size] = [100, 100, 100]
+        if emit and (frame is None or use_fallback):
+            np.copyto(fallback_frame, _TEST_PATTERN)
+            frame = fallback_frame
             
             # Add frame number text
             cv2.putText(
@@ -144,54 +365,57 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
                 2,
             )
         
-        # Ensure frame is BGR for encoding
-        if frame is not None:
-            if len(frame.shape) == 2:  # Grayscale
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-            
-            # Resize large frames to reasonable size for streaming (max 800 width)
-            frame_height, frame_width = frame.shape[:2]
-            if frame_width > 800:
-                scale = 800 / frame_width
-                new_width = int(frame_width * scale)
-                new_height = int(frame_height * scale)
-                frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
-                frame_width, frame_height = new_width, new_height
-            
-            # Convert to JPEG bytes (much faster than PNG)
-            success, frame_bytes = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-            
-            if success:
-                payload = WorkerPayload(
-                    worker=name,
-                    sequence_id=frame_count,
-                    monotonic_ts=time.monotonic(),
-                    payload_type=WorkerPayloadType.frame,
-                    data=frame_bytes.tobytes(),
-                    metadata={"format": "jpeg", "width": frame_width, "height": frame_height},
-                )
-                try:
-                    data_queue.put(payload, block=False)
-                    frame_count += 1
-                except Exception:
-                    pass  # queue full, skip frame
-
-        now = time.time()
-        if (now - last_heartbeat) >= 0.1:
+        heartbeat_raw = None
+        if (now_mono - last_heartbeat) >= 0.1:
             heartbeat = WorkerPayload(
                 worker=name,
                 sequence_id=0,
-                monotonic_ts=time.monotonic(),
+                monotonic_ts=now_mono,
                 payload_type=WorkerPayloadType.heartbeat,
                 data=b"",
                 metadata=None,
             )
-            data_queue.put(heartbeat)
-            last_heartbeat = now
+            heartbeat_raw = encode_payload(heartbeat)
+
+        if frame is not None:
+            # The encoder thread sends a due heartbeat along with the frame
+            encode_job = encoder.submit(encode_and_enqueue, frame, heartbeat_raw)
+            next_emit_ts = max(next_emit_ts + emit_interval, now_mono)
+            if heartbeat_raw is not None:
+                last_heartbeat = now_mono
+                heartbeat_raw = None
+        # Never block the grab loop on a slow consumer; an undelivered heartbeat
+        # is retried next iteration because last_heartbeat is left unchanged
+        if heartbeat_raw is not None:
+            try:
+                data_queue.put(heartbeat_raw, block=False)
+                last_heartbeat = now_mono
+            except queue.Full:
+                dropped += 1
+        # frame_drops is only read here (once), so the encoder thread's count is never lost
+        total_frame_drops = frame_drops
+        dropped += total_frame_drops - reported_frame_drops
+        reported_frame_drops = total_frame_drops
+        if (dropped or grab_failures) and (now_mono - last_drop_report) >= 1.0:
+            if dropped:
+                print(f"[CameraWorker:{name}] Data queue full, dropped {dropped} payload(s)")
+            if grab_failures:
+                print(f"[CameraWorker:{name}] {grab_failures} grab(s) failed, last error code: {last_grab_error}")
+            dropped = 0
+            grab_failures = 0
+            last_drop_report = now_mono
 
-        time.sleep(interval)
+        # Deadline pacing: grab/encode time counts toward the period instead of adding to it
+        next_tick += interval
+        end_mono = time.monotonic()
+        slack = next_tick - end_mono
+        if slack > 0:
+            time.sleep(slack)
+        else:
+            next_tick = end_mono  # overran; drop the accumulated debt
     
     # Cleanup
+    encoder.shutdown(wait=True)
     if camera:
         try:
             if camera.IsGrabbing():
@@ -200,3 +424,5 @@ def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
             print("[CameraWorker] Camera closed")
         except Exception as e:
             print(f"[CameraWorker] Error closing camera: {e}")
+    if frame_ring is not None:
+        frame_ring.close()
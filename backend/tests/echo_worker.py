@@ -0,0 +1,24 @@
+"""Minimal process worker for tests: echoes every control message back."""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+from app.shared.schemas import WorkerPayload, WorkerPayloadType, decode_control, encode_control, encode_payload
+
+
+def _heartbeat(name: str) -> bytes:
+    return encode_payload(
+        WorkerPayload(worker=name, monotonic_ts=time.monotonic(), payload_type=WorkerPayloadType.heartbeat, data=b"")
+    )
+
+
+def run(control_conn, data_queue, config: Dict[str, Any]) -> None:
+    name = config.get("name", "echo")
+    while True:
+        message = decode_control(control_conn.recv_bytes())
+        # Keeps the manager's blocking data-queue read from outliving the worker
+        data_queue.put(_heartbeat(name))
+        if message.command == "shutdown":
+            return
+        control_conn.send_bytes(encode_control(message))
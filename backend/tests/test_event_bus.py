@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.event_bus import BroadcastBuffer, EventBus
+
+
+def test_broadcast_read_from_reports_overwritten_entries():
+    buffer = BroadcastBuffer(capacity=4)
+    for n in range(3):
+        buffer.publish(n)
+    assert buffer.read_from(0) == ([0, 1, 2], 3, 0)
+
+    for n in range(3, 10):
+        buffer.publish(n)
+    # Seqs 0..5 were overwritten: a reader still at 3 skips ahead to 6
+    assert buffer.read_from(3) == ([6, 7, 8, 9], 10, 3)
+    # An up-to-date reader gets nothing and keeps its cursor
+    assert buffer.read_from(10) == ([], 10, 0)
+
+
+def test_broadcast_subscribe_lingers_to_batch_bursts():
+    async def scenario() -> list:
+        buffer = BroadcastBuffer(capacity=16)
+        stream = buffer.subscribe(linger=0.05)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)  # let the reader park on the ready event
+        for n in range(5):
+            buffer.publish(n)
+            await asyncio.sleep(0.001)
+        batch = await asyncio.wait_for(first, 1)
+        await stream.aclose()
+        return batch
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4]
+
+
+def test_broadcast_subscribe_keeps_newest_of_oversized_batch():
+    async def scenario() -> list:
+        buffer = BroadcastBuffer(capacity=16)
+        stream = buffer.subscribe(max_batch=2, linger=0.01)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        for n in range(5):
+            buffer.publish(n)
+        batch = await asyncio.wait_for(first, 1)
+        await stream.aclose()
+        return batch
+
+    assert asyncio.run(scenario()) == [3, 4]
+
+
+def test_event_bus_slow_subscriber_sees_latest_samples():
+    async def scenario() -> list:
+        bus = EventBus()
+        stream = bus.subscribe("telemetry", max_queue=3)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        for n in range(6):
+            bus.publish("telemetry", n)
+        received = [await asyncio.wait_for(first, 1)]
+        for _ in range(2):
+            received.append(await asyncio.wait_for(stream.__anext__(), 1))
+        await stream.aclose()
+        # Closing the stream unsubscribes; publishing afterwards is a no-op
+        bus.publish("telemetry", 99)
+        assert "telemetry" not in bus._topics
+        return received
+
+    assert asyncio.run(scenario()) == [3, 4, 5]
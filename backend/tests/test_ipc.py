@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+
+import pytest
+
+from app.shared.schemas import WorkerPayload, WorkerPayloadType, encode_payload
+from app.worker.ipc import DataChannel, FrameRing
+
+
+@pytest.fixture
+def ring():
+    frame_ring = FrameRing.create(slots=3, slot_size=8)
+    yield frame_ring
+    frame_ring.close()
+
+
+def test_frame_ring_wraps_after_last_slot(ring):
+    refs = []
+    for n in range(4):
+        refs.append(ring.write(bytes([n]) * 4))
+        ring.advance()
+    assert refs == [(0, 4), (1, 4), (2, 4), (0, 4)]
+    # The wrapped write reused slot 0; slot 1 still holds its frame
+    assert ring.read(0, 4) == b"\x03" * 4
+    assert ring.read(1, 4) == b"\x01" * 4
+
+
+def test_frame_ring_rejects_oversized_frames(ring):
+    assert ring.write(b"x" * 9) is None
+    assert ring.write(b"x" * 8) == (0, 8)
+
+
+def test_frame_ring_attach_shares_memory(ring):
+    attached = FrameRing.attach(ring.descriptor())
+    try:
+        slot, length = attached.write(b"frame")
+        assert ring.read(slot, length) == b"frame"
+    finally:
+        attached.close()
+
+
+def _payload(sequence_id: int, **fields) -> WorkerPayload:
+    return WorkerPayload(
+        worker="cam",
+        monotonic_ts=0.0,
+        payload_type=fields.pop("payload_type", WorkerPayloadType.frame),
+        data=fields.pop("data", b""),
+        sequence_id=sequence_id,
+        **fields,
+    )
+
+
+def test_data_channel_resolves_ring_tokens_and_list_items(ring):
+    slot, length = ring.write(b"pixels")
+    items: queue.Queue = queue.Queue()
+    # A frame token plus its heartbeat, sent as one put, then a lone payload
+    items.put([
+        encode_payload(_payload(1, data_ref=(slot, length))),
+        encode_payload(_payload(2, payload_type=WorkerPayloadType.heartbeat)),
+    ])
+    items.put(encode_payload(_payload(3, data=b"inline")))
+    channel = DataChannel(items, ring)
+
+    async def scenario() -> list:
+        first = await channel.get()
+        # get() left the heartbeat pending; get_batch hands it out before the queue
+        return [first] + await channel.get_batch()
+
+    received = asyncio.run(scenario())
+    assert [p.sequence_id for p in received] == [1, 2, 3]
+    assert received[0].data == b"pixels" and received[0].data_ref is None
+    assert received[2].data == b"inline"
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.services.hardware.meca500 import Meca500Controller
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _FakeRobot:
+    """Robot stand-in whose Wait* calls block until their event is set, like mecademicpy's."""
+
+    def __init__(self) -> None:
+        self.idle = threading.Event()
+        self.homed = threading.Event()
+
+    def Home(self) -> None:
+        pass
+
+    def WaitIdle(self, timeout: float) -> None:
+        if not self.idle.wait(timeout):
+            raise _Timeout
+
+    def WaitHomed(self, timeout: float) -> None:
+        if not self.homed.wait(timeout):
+            raise _Timeout
+
+
+def _controller() -> tuple[Meca500Controller, _FakeRobot]:
+    controller = Meca500Controller(enable_callbacks=False)
+    robot = _FakeRobot()
+    controller.robot = robot
+    controller._mdr = SimpleNamespace(TimeoutException=_Timeout)
+    return controller, robot
+
+
+def test_wait_idle_leaves_io_thread_free_for_other_calls():
+    async def scenario() -> None:
+        controller, robot = _controller()
+        waiter = asyncio.create_task(controller.wait_idle(timeout=10))
+        await asyncio.sleep(0.1)
+        # Would queue behind a single 10 s WaitIdle on the one I/O thread
+        assert await asyncio.wait_for(controller._run_io(lambda: "status"), 1) == "status"
+        assert not waiter.done()
+        robot.idle.set()
+        assert await asyncio.wait_for(waiter, 1) is True
+
+    asyncio.run(scenario())
+
+
+def test_wait_idle_times_out():
+    async def scenario() -> None:
+        controller, _ = _controller()
+        assert await controller.wait_idle(timeout=0.12) is False
+
+    asyncio.run(scenario())
+
+
+def test_home_without_callbacks_does_not_hold_io_thread():
+    async def scenario() -> None:
+        controller, robot = _controller()
+        homing = asyncio.create_task(controller.home())
+        await asyncio.sleep(0.1)
+        assert await asyncio.wait_for(controller._run_io(lambda: "status"), 1) == "status"
+        robot.homed.set()
+        assert await asyncio.wait_for(homing, 1) is True
+        assert controller._homed
+
+    asyncio.run(scenario())
+
+
+def test_get_state_reads_pose_joints_and_status_in_one_hop():
+    calls = []
+    status = SimpleNamespace(motion_status=False, error_status=False, pause_motion_status=False)
+
+    def reader(name, value):
+        def read():
+            calls.append(name)
+            return value
+        return read
+
+    async def scenario() -> None:
+        controller, _ = _controller()
+        controller._read_fns = {
+            "GetPose": reader("GetPose", (1.0, 2.0, 3.0, 0.0, 90.0, 0.0)),
+            "GetJoints": reader("GetJoints", [0.0] * 6),
+            "GetStatusRobot": reader("GetStatusRobot", status),
+        }
+        pose, joints, state = await controller.get_state()
+        assert pose == {"x": 1.0, "y": 2.0, "z": 3.0, "alpha": 0.0, "beta": 90.0, "gamma": 0.0}
+        assert joints == (0.0,) * 6
+        assert state["is_moving"] is False
+        # The fused read seeds the cache, so an immediate single read costs no robot call
+        assert await controller.get_pose() == pose
+        assert calls == ["GetPose", "GetJoints", "GetStatusRobot"]
+
+    asyncio.run(scenario())
+
+
+def test_home_with_callbacks_ignores_a_stale_homed_event():
+    async def scenario() -> None:
+        controller, robot = _controller()
+        robot.GetStatusRobot = lambda: SimpleNamespace(homing_state=False)
+        controller._callback_loop = asyncio.get_running_loop()
+        controller._homed_event.set()  # left over from before the robot lost homing
+        homing = asyncio.create_task(controller.home())
+        await asyncio.sleep(0.1)
+        assert not homing.done()
+        controller._homed = True
+        controller._sync_state_events()  # what the on_homed callback schedules
+        assert await asyncio.wait_for(homing, 1) is True
+
+    asyncio.run(scenario())
+
+
+def test_home_with_callbacks_returns_when_already_homed():
+    async def scenario() -> None:
+        controller, robot = _controller()
+        # Home() on a homed robot reports no transition, so no callback follows
+        robot.GetStatusRobot = lambda: SimpleNamespace(homing_state=True)
+        controller._callback_loop = asyncio.get_running_loop()
+        assert await asyncio.wait_for(controller.home(), 1) is True
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_releases_the_io_thread_and_reconnect_gets_a_new_one():
+    async def scenario() -> None:
+        controller, robot = _controller()
+        robot.Disconnect = lambda: None
+        await controller._run_io(lambda: None)
+        first = controller._io_executor
+        await controller.disconnect()
+        assert controller._io_executor is None
+        assert first._shutdown
+        assert await controller._run_io(lambda: "again") == "again"
+        assert controller._io_executor is not first
+        await controller.disconnect()
+
+    asyncio.run(scenario())
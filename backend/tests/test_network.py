@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.network import (
+    _calculate_meca_address,
+    _int_to_ip,
+    _ip_to_int,
+    _netmask_to_int,
+    validate_meca_address,
+)
+
+
+@pytest.mark.parametrize("address", ["0.0.0.0", "10.0.0.1", "192.168.0.101", "255.255.255.255"])
+def test_ip_to_int_round_trips(address):
+    assert _int_to_ip(_ip_to_int(address)) == address
+
+
+def test_ip_to_int_is_big_endian():
+    assert _ip_to_int("192.168.0.1") == 0xC0A80001
+
+
+@pytest.mark.parametrize("prefix", range(33))
+def test_netmask_dotted_and_prefix_forms_agree(prefix):
+    mask = _netmask_to_int(str(prefix))
+    assert bin(mask).count("1") == prefix
+    assert _netmask_to_int(_int_to_ip(mask)) == mask
+
+
+@pytest.mark.parametrize("netmask", ["255.0.255.0", "33"])
+def test_netmask_rejects_invalid_masks(netmask):
+    with pytest.raises(ValueError):
+        _netmask_to_int(netmask)
+
+
+def test_meca_address_stays_on_the_adapter_subnet():
+    assert _calculate_meca_address("192.168.0.101", "255.255.255.0") == "192.168.0.100"
+    # /16: 50 below the broadcast address
+    assert _calculate_meca_address("10.1.2.3", "16") == "10.1.255.205"
+    assert validate_meca_address("192.168.0.100", "192.168.0.101", "24")
+    assert not validate_meca_address("192.168.1.100", "192.168.0.101", "255.255.255.0")
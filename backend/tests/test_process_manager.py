@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.shared.schemas import ControlMessage
+from app.worker.process_manager import WorkerProcessManager, WorkerSpec
+
+
+async def _ignore_payload(payload) -> None:
+    pass
+
+
+def test_worker_spec_rejects_malformed_target():
+    with pytest.raises(ValueError):
+        WorkerSpec(name="bad", target="tests.echo_worker.run", config={})
+
+
+def test_control_channel_is_shared_between_callers():
+    async def scenario() -> None:
+        manager = WorkerProcessManager(_ignore_payload)
+        await manager.start_worker(WorkerSpec(name="echo", target="tests.echo_worker:run", config={"name": "echo"}))
+        try:
+            first = manager.get_control_channel("echo")
+            await first.send(ControlMessage(command="ping", args={"n": 1}))
+            assert (await asyncio.wait_for(first.recv(), 10)).args == {"n": 1}
+
+            # A second lookup must not steal the first caller's reader
+            second = manager.get_control_channel("echo")
+            assert second is first
+            await second.send(ControlMessage(command="ping", args={"n": 2}))
+            assert (await asyncio.wait_for(second.recv(), 10)).args == {"n": 2}
+            await first.send(ControlMessage(command="ping", args={"n": 3}))
+            assert (await asyncio.wait_for(first.recv(), 10)).args == {"n": 3}
+        finally:
+            await manager.shutdown()
+        assert manager.get_control_channel("echo") is None
+
+    asyncio.run(scenario())
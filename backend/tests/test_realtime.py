@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+from prometheus_client import REGISTRY
+
+from app.core.realtime import RealTimeCoordinator, RealtimeTaskConfig
+
+
+async def _noop() -> None:
+    pass
+
+
+def _config(name: str, period_ms: float = 1000, **overrides) -> RealtimeTaskConfig:
+    return RealtimeTaskConfig(name=name, period_ms=period_ms, deadline_ms=period_ms, **overrides)
+
+
+def test_next_period_skips_missed_periods():
+    # On time: the next slot is one period after the scheduled start
+    assert RealTimeCoordinator._next_period(10.0, 1.0, 10.5) == 11.0
+    # Overran by 2.5 periods: slots 11 and 12 are skipped, not fired back-to-back
+    assert RealTimeCoordinator._next_period(10.0, 1.0, 12.5) == 13.0
+    # A run ending exactly on a slot boundary must not reuse that slot
+    assert RealTimeCoordinator._next_period(10.0, 1.0, 11.0) == 12.0
+
+
+def test_replace_top_leaves_older_entries_stale():
+    async def scenario() -> None:
+        coordinator = RealTimeCoordinator()
+        handle = coordinator.register_task(_config("tick"), _noop)
+        # run_immediately pushes a second entry at the head; the first goes stale
+        coordinator.run_immediately("tick")
+        assert len(coordinator._queue) == 2
+
+        head_before = coordinator._queue[0]
+        handle.next_run = head_before[0] + 5.0
+        coordinator._replace_top(handle)
+
+        assert head_before not in coordinator._queue
+        live = [entry for entry in coordinator._queue if entry[3] == handle._generation]
+        assert len(live) == 1 and live[0][0] == handle.next_run
+        # Only the original registration entry is left behind, and it is stale
+        assert len(coordinator._queue) == 2
+
+    asyncio.run(scenario())
+
+
+def test_slow_task_does_not_delay_others_by_default():
+    async def scenario() -> None:
+        fast_runs = 0
+
+        async def slow() -> None:
+            await asyncio.sleep(0.3)
+
+        async def fast() -> None:
+            nonlocal fast_runs
+            fast_runs += 1
+
+        coordinator = RealTimeCoordinator()
+        await coordinator.start()
+        coordinator.register_task(_config("slow", period_ms=10, priority=0), slow)
+        coordinator.register_task(_config("fast", period_ms=10, priority=1), fast)
+        await asyncio.sleep(0.25)
+        await coordinator.stop()
+        # Inline, the slow task's first tick would hold the scheduler the whole time
+        assert fast_runs >= 5
+
+    asyncio.run(scenario())
+
+
+def test_queue_depth_gauge_counts_live_tasks_of_running_coordinator():
+    def depth() -> float:
+        return REGISTRY.get_sample_value("rt_queue_depth")
+
+    async def scenario() -> None:
+        coordinator = RealTimeCoordinator()
+        await coordinator.start()
+        coordinator.register_task(_config("a"), _noop)
+        handle = coordinator.register_task(_config("b"), _noop)
+        coordinator.run_immediately("a")  # leaves a stale heap entry behind
+        assert depth() == 2
+        handle.cancel()
+        assert depth() == 1
+        await coordinator.stop()
+        assert depth() == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import msgspec
+import pytest
+
+from app.shared.schemas import (
+    ControlMessage,
+    WorkerPayload,
+    WorkerPayloadType,
+    decode_control,
+    decode_payload,
+    encode_control,
+    encode_payload,
+)
+
+
+def test_worker_payload_round_trips():
+    payload = WorkerPayload(
+        worker="overhead_camera",
+        monotonic_ts=12.5,
+        payload_type=WorkerPayloadType.frame,
+        data=b"\x00\xffjpeg",
+        sequence_id=7,
+        metadata={"width": 640, "height": 480},
+        data_ref=(3, 1024),
+    )
+    assert decode_payload(encode_payload(payload)) == payload
+
+
+def test_worker_payload_is_positional_on_the_wire():
+    payload = WorkerPayload(worker="bota", monotonic_ts=1.0, payload_type=WorkerPayloadType.heartbeat, data=b"")
+    # array_like: field order is the wire format, so no field names are sent
+    assert msgspec.msgpack.decode(encode_payload(payload)) == ["bota", 1.0, "heartbeat", b"", 0, None, None]
+    # Older senders that omit trailing fields still decode with defaults
+    older = msgspec.msgpack.encode(["bota", 1.0, "heartbeat", b""])
+    assert decode_payload(older) == payload
+
+
+def test_control_message_round_trips():
+    message = ControlMessage(command="set_fps", args={"value": 15})
+    assert decode_control(encode_control(message)) == message
+    assert decode_control(encode_control(ControlMessage(command="shutdown"))).args == {}
+
+
+def test_decode_payload_rejects_unknown_type():
+    raw = msgspec.msgpack.encode(["bota", 1.0, "bogus", b""])
+    with pytest.raises(msgspec.ValidationError):
+        decode_payload(raw)
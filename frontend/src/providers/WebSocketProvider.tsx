@@ -8,6 +8,9 @@ type WsContextValue = {
 };
 
 const WebSocketContext = createContext<WsContextValue | null>(null);
+const textDecoder = new TextDecoder();
+// Negotiated on /ws/telemetry, whose frames are binary JSON
+const TELEMETRY_SUBPROTOCOL = "binary.telemetry.v1";
 
 export function WebSocketProvider({ children }: { children: React.ReactNode }) {
   const handlers = useRef<Map<string, Set<MessageHandler>>>(new Map());
@@ -42,7 +45,8 @@ export function WebSocketProvider({ children }: { children: React.ReactNode }) {
     const connect = () => {
       if (!mountedRef.current) return;
       console.log(`[WS] Connecting to ${wsPath}`);
-      const ws = new WebSocket(`${baseUrl}${wsPath}`);
+      const protocols = wsPath === "/ws/telemetry" ? [TELEMETRY_SUBPROTOCOL] : undefined;
+      const ws = new WebSocket(`${baseUrl}${wsPath}`, protocols);
 
       ws.onopen = () => {
         if (!mountedRef.current) { ws.close(); return; }
@@ -50,15 +54,22 @@ export function WebSocketProvider({ children }: { children: React.ReactNode }) {
         sockets.current.set(wsPath, ws);
       };
 
+      // Telemetry arrives as binary JSON frames; camera/sensor still use text
+      ws.binaryType = "arraybuffer";
+
       ws.onmessage = (event) => {
         if (!mountedRef.current) return;
         try {
-          const parsed = JSON.parse(event.data);
+          const text = typeof event.data === "string" ? event.data : textDecoder.decode(event.data);
+          const parsed = JSON.parse(text);
           const topic = parsed.topic as string;
-          const payload = parsed.payload;
           const topicHandlers = handlers.current.get(topic);
           if (topicHandlers && topicHandlers.size > 0) {
-            topicHandlers.forEach((cb) => cb(topic, payload));
+            // Batched frames carry {"topic", "batch": [...]}; deliver in order
+            const payloads: unknown[] = Array.isArray(parsed.batch) ? parsed.batch : [parsed.payload];
+            payloads.forEach((payload) => {
+              topicHandlers.forEach((cb) => cb(topic, payload));
+            });
           }
         } catch (err) {
           console.error("WS parse error", err);